@@ -63,8 +63,14 @@ detect_system() {
 update_system() {
     print_status "Updating system packages..."
     
-    apt update
-    apt upgrade -y
+    # Reuse package lists refreshed within the last hour (re-runs, reimaging)
+    if [[ -n "$(find /var/lib/apt/periodic/update-success-stamp /var/lib/apt/lists -maxdepth 0 -mmin -60 2>/dev/null)" ]]; then
+        print_status "Package lists are up to date, skipping update"
+    else
+        apt-get update
+    fi
+    DEBIAN_FRONTEND=noninteractive apt-get upgrade -y \
+        -o Dpkg::Options::=--force-confdef -o Dpkg::Options::=--force-confold
     
     print_success "System packages updated"
 }
@@ -82,8 +88,6 @@ install_dependencies() {
         "build-essential"
         "sqlite3"
         "curl"
-        "wget"
-        "git"
         "nginx"
     )
     
@@ -100,7 +104,9 @@ install_dependencies() {
         )
     fi
     
-    apt install -y "${PACKAGES[@]}"
+    # Skip recommends: they pull in docs and X11 libraries the rover never uses
+    DEBIAN_FRONTEND=noninteractive apt-get install -y --no-install-recommends \
+        -o Dpkg::Options::=--force-confdef -o Dpkg::Options::=--force-confold "${PACKAGES[@]}"
     
     print_success "System dependencies installed"
 }
@@ -109,17 +115,22 @@ install_dependencies() {
 create_user() {
     print_status "Creating system user: $SERVICE_USER"
     
+    # Hardware groups only exist on the Pi
+    GROUP_ARGS=()
+    if [[ "$SYSTEM_TYPE" == "raspberry_pi" ]]; then
+        GROUP_ARGS=(-G gpio,i2c,spi,bluetooth,video)
+    fi
+    
     if ! id "$SERVICE_USER" &>/dev/null; then
-        useradd --system --shell /bin/false --home "$DATA_DIR" --create-home "$SERVICE_USER"
+        # Groups are assigned in the same call so the user never exists without them
+        useradd --system --shell /bin/false --home "$DATA_DIR" --create-home "${GROUP_ARGS[@]}" "$SERVICE_USER"
         print_success "Created user: $SERVICE_USER"
     else
         print_warning "User $SERVICE_USER already exists"
-    fi
-    
-    # Add user to required groups
-    if [[ "$SYSTEM_TYPE" == "raspberry_pi" ]]; then
-        usermod -a -G gpio,i2c,spi,bluetooth,video "$SERVICE_USER"
-        print_success "Added $SERVICE_USER to hardware groups"
+        if [[ ${#GROUP_ARGS[@]} -gt 0 ]]; then
+            usermod -a "${GROUP_ARGS[@]}" "$SERVICE_USER"
+            print_success "Added $SERVICE_USER to hardware groups"
+        fi
     fi
 }
 
@@ -138,11 +149,10 @@ create_directories() {
         "/var/run/smartrover"
     )
     
-    for dir in "${DIRECTORIES[@]}"; do
-        mkdir -p "$dir"
-        chown "$SERVICE_USER:$SERVICE_USER" "$dir"
-        chmod 755 "$dir"
-    done
+    # One call each, so the user and group are resolved once rather than per directory
+    mkdir -p "${DIRECTORIES[@]}"
+    chown "$SERVICE_USER:$SERVICE_USER" "${DIRECTORIES[@]}"
+    chmod 755 "${DIRECTORIES[@]}"
     
     print_success "Directories created"
 }
@@ -157,22 +167,24 @@ install_python_deps() {
     # Activate virtual environment
     source "$INSTALL_DIR/venv/bin/activate"
     
-    # Upgrade pip
-    pip install --upgrade pip setuptools wheel
-    
-    # Install core dependencies
-    pip install numpy
-    pip install opencv-python
-    pip install tensorflow
-    pip install flask
-    pip install flask-cors
-    pip install gpiozero
-    pip install RPi.GPIO
-    pip install psutil
-    pip install requests
-    pip install Pillow
-    pip install scipy
-    pip install bleak
+    # Install core dependencies with the venv's bundled pip in one resolver run
+    pip install --no-compile --prefer-binary --no-input --disable-pip-version-check \
+        numpy \
+        opencv-python \
+        tensorflow \
+        flask \
+        flask-cors \
+        gpiozero \
+        RPi.GPIO \
+        psutil \
+        requests \
+        Pillow \
+        scipy \
+        bleak
+    
+    # The service runs with ProtectSystem=strict and can't write .pyc files itself,
+    # so compile once here on all cores instead of pip's serial per-package pass
+    python -m compileall -q -j 0 "$INSTALL_DIR/venv" >/dev/null || true
     
     # Set ownership
     chown -R "$SERVICE_USER:$SERVICE_USER" "$INSTALL_DIR/venv"
@@ -193,8 +205,7 @@ copy_project_files() {
     
     # Set ownership and permissions
     chown -R "$SERVICE_USER:$SERVICE_USER" "$INSTALL_DIR"
-    chmod +x "$INSTALL_DIR"/*.py
-    chmod +x "$INSTALL_DIR"/*.sh
+    chmod +x "$INSTALL_DIR"/*.py "$INSTALL_DIR"/*.sh
     
     print_success "Project files copied"
 }
@@ -207,17 +218,62 @@ configure_raspberry_pi() {
     
     print_status "Configuring Raspberry Pi settings..."
     
-    # Enable required interfaces
-    raspi-config nonint do_i2c 0
-    raspi-config nonint do_spi 0
-    raspi-config nonint do_camera 0
-    raspi-config nonint do_ssh 0
+    # Newer images keep config.txt under /boot/firmware
+    local boot_config="/boot/config.txt"
+    [[ -f /boot/firmware/config.txt ]] && boot_config="/boot/firmware/config.txt"
+    if [[ ! -f "$boot_config" ]]; then
+        print_warning "$boot_config not found, skipping boot configuration"
+        return
+    fi
     
-    # Set GPU memory split
-    raspi-config nonint do_memory_split 128
+    # Edit config.txt directly instead of launching raspi-config per setting:
+    # each "key=value" replaces an existing (or commented-out) key, or is appended
+    local tmp_config="$boot_config.smartrover.tmp"
+    awk -v settings="dtparam=i2c_arm=on dtparam=spi=on start_x=1 gpu_mem=128" '
+        BEGIN {
+            n = split(settings, setting, " ")
+            for (i = 1; i <= n; i++) {
+                key[i] = setting[i]
+                sub(/=[^=]*$/, "=", key[i])
+            }
+        }
+        {
+            if ($0 ~ /^\[/) in_section = ($0 != "[all]")
+            line = $0
+            sub(/^#[[:space:]]*/, "", line)
+            for (i = 1; i <= n; i++) {
+                if (index(line, key[i]) == 1) {
+                    if (!done[i]) print setting[i]
+                    done[i] = 1
+                    next
+                }
+            }
+            print
+        }
+        END {
+            # Keep appended settings out of model-specific sections like [pi4]
+            for (i = 1; i <= n; i++) {
+                if (done[i]) continue
+                if (in_section) print "[all]"
+                in_section = 0
+                print setting[i]
+            }
+        }
+    ' "$boot_config" > "$tmp_config"
     
     # Enable hardware PWM
-    echo "dtoverlay=pwm-2chan" >> /boot/config.txt
+    grep -qxF "dtoverlay=pwm-2chan" "$tmp_config" || echo "dtoverlay=pwm-2chan" >> "$tmp_config"
+    
+    if cmp -s "$tmp_config" "$boot_config"; then
+        rm -f "$tmp_config"
+    else
+        mv "$tmp_config" "$boot_config"
+    fi
+    
+    # raspi-config's I2C step also loads the userspace device driver at boot
+    grep -qxF "i2c-dev" /etc/modules 2>/dev/null || echo "i2c-dev" >> /etc/modules
+    
+    systemctl enable --now ssh
     
     print_success "Raspberry Pi configured"
 }
@@ -306,6 +362,7 @@ Group=$SERVICE_USER
 WorkingDirectory=$INSTALL_DIR
 Environment=PATH=$INSTALL_DIR/venv/bin
 Environment=PYTHONPATH=$INSTALL_DIR
+Environment=PYTHONDONTWRITEBYTECODE=1
 ExecStart=$INSTALL_DIR/venv/bin/python $INSTALL_DIR/scripts/standalone_vehicle_server.py
 Restart=always
 RestartSec=10
@@ -324,18 +381,18 @@ ReadWritePaths=$DATA_DIR $LOG_DIR /var/run/smartrover
 WantedBy=multi-user.target
 EOF
 
-    # Reload systemd and enable services
+    # Reload systemd; the unit is enabled and started together in start_services
     systemctl daemon-reload
-    systemctl enable smartrover.service
     
-    print_success "Systemd services created and enabled"
+    print_success "Systemd services created"
 }
 
 # Setup Nginx reverse proxy
 setup_nginx() {
     print_status "Setting up Nginx reverse proxy..."
     
-    cat > /etc/nginx/sites-available/smartrover << 'EOF'
+    # Write to a temp file and rename it into place, so nginx never sees a partial config
+    cat > /etc/nginx/sites-available/.smartrover.tmp << 'EOF'
 server {
     listen 80 default_server;
     listen [::]:80 default_server;
@@ -391,8 +448,12 @@ server {
 }
 EOF
     
-    # Enable site and remove default
-    ln -sf /etc/nginx/sites-available/smartrover /etc/nginx/sites-enabled/
+    mv -f /etc/nginx/sites-available/.smartrover.tmp /etc/nginx/sites-available/smartrover
+    
+    # Enable site by renaming a fresh symlink over the old one (ln -sf unlinks first).
+    # Dotfiles are not matched by nginx's sites-enabled/* include
+    ln -sfn /etc/nginx/sites-available/smartrover /etc/nginx/sites-enabled/.smartrover.new
+    mv -Tf /etc/nginx/sites-enabled/.smartrover.new /etc/nginx/sites-enabled/smartrover
     rm -f /etc/nginx/sites-enabled/default
     
     # Test configuration
@@ -467,12 +528,25 @@ initialize_database() {
     python3 "$INSTALL_DIR/scripts/production_setup.py" || print_warning "Production setup had some issues"
 }
 
+# Poll the health endpoint with exponential backoff (0.5s doubling, capped at 5s)
+wait_for_health() {
+    local delay=0.5
+    for _ in $(seq 1 12); do
+        if curl -sf http://localhost:5000/health >/dev/null; then
+            return 0
+        fi
+        sleep "$delay"
+        delay=$(awk -v d="$delay" 'BEGIN { d *= 2; print (d > 5 ? 5 : d) }')
+    done
+    return 1
+}
+
 # Start services
 start_services() {
     print_status "Starting services..."
     
-    systemctl start smartrover
-    sleep 5
+    systemctl enable --now smartrover.service
+    wait_for_health || print_warning "Service may still be starting..."
     systemctl status smartrover --no-pager || print_warning "Service may still be starting..."
     
     print_success "Services started"
@@ -491,8 +565,7 @@ verify_installation() {
     fi
     
     # Check API endpoint
-    sleep 10
-    if curl -s http://localhost:5000/health >/dev/null; then
+    if wait_for_health; then
         print_success "API endpoint is responding"
     else
         print_error "API endpoint is not responding"
@@ -571,6 +644,12 @@ main() {
     setup_logrotate
     create_management_scripts
     initialize_database
+    
+    # One flush for every file written above, as production_setup.py does; the units and
+    # configs must be on the SD card before the services start
+    print_status "Flushing files to disk..."
+    sync
+    
     start_services
     
     if verify_installation; then
@@ -22,6 +22,7 @@ class DependencyInstaller:
             'opencv-python',
             'flask',
             'flask-cors',
+            'waitress',
             'gpiozero',
             'RPi.GPIO',
             'psutil',
@@ -13,6 +13,7 @@ import logging
 from collections import deque
 import matplotlib.pyplot as plt
 from scipy.spatial import KDTree
+from scipy.ndimage import distance_transform_edt
 import json
 import sqlite3
 from datetime import datetime
@@ -28,23 +29,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Occupancy grid levels (uint8, 0 = free, 255 = occupied)
+OCCUPIED = 255
+INFLATED = 204  # 0.8 of occupied, safety margin around obstacles
+
+# Occupancy thresholds (cells strictly above are classed as such)
+BLOCKED_THRESHOLD = 229  # 0.9 of occupied, impassable
+OBSTACLE_THRESHOLD = 127  # 0.5 of occupied, obstacle or near obstacle
+UNCERTAIN_THRESHOLD = 25  # 0.1 of occupied, uncertain area
+
+# Pure pursuit heading error bands
+LARGE_HEADING_ERROR = math.radians(45)
+MODERATE_HEADING_ERROR = math.radians(10)
+
 class PathPlanner:
     def __init__(self, map_width=2000, map_height=2000, resolution=1.0):
         self.map_width = map_width
         self.map_height = map_height
         self.resolution = resolution  # meters per pixel
         
-        # Occupancy grid (0 = free, 1 = occupied, 0.5 = unknown)
-        self.occupancy_grid = np.zeros((map_height, map_width), dtype=np.float32)
+        # Occupancy grid (0 = free, 255 = occupied, 128 = unknown)
+        self.occupancy_grid = np.zeros((map_height, map_width), dtype=np.uint8)
         
-        # Cost map for path planning
-        self.cost_map = np.ones((map_height, map_width), dtype=np.float32)
+        # Cost map for path planning (1 = free ... 1000 = obstacle)
+        self.cost_map = np.ones((map_height, map_width), dtype=np.uint16)
+        
+        # Scratch buffer reused by every cost map update instead of per-call temporaries
+        self._cost_scratch = np.empty((map_height, map_width), dtype=np.float32)
         
         # Inflation radius for obstacles (in pixels)
         self.inflation_radius = 10
         
+        # Grid regions (x0, y0, x1, y1) touched since the last update / holding non-zero cells
+        self._dirty_bbox = None
+        self._occupied_bbox = None
+        
         # Vehicle parameters
         self.vehicle_radius = 5  # pixels
+        
+        # Extra cost near obstacles falls off as cost_falloff / clearance (in pixels)
+        self.cost_falloff = 50.0
         self.max_speed = 2.0  # m/s
         self.max_acceleration = 1.0  # m/s²
         self.max_turn_rate = 45  # degrees/second
@@ -58,7 +82,11 @@ class PathPlanner:
         """Update occupancy grid with new obstacle information"""
         try:
             # Clear previous dynamic obstacles (keep static ones)
-            self.occupancy_grid *= 0.9  # Fade old obstacles
+            if self._occupied_bbox is not None:
+                x0, y0, x1, y1 = self._occupied_bbox
+                faded = self.occupancy_grid[y0:y1, x0:x1]
+                np.multiply(faded, 0.9, out=faded, casting='unsafe')  # Fade old obstacles
+                self._mark_dirty(x0, y0, x1, y1)
             
             # Add new obstacles
             for obstacle in obstacles:
@@ -78,53 +106,118 @@ class PathPlanner:
                             if dx*dx + dy*dy <= obstacle_radius*obstacle_radius:
                                 ox, oy = grid_x + dx, grid_y + dy
                                 if 0 <= ox < self.map_width and 0 <= oy < self.map_height:
-                                    self.occupancy_grid[oy, ox] = 1.0
+                                    self.occupancy_grid[oy, ox] = OCCUPIED
+                    
+                    self._mark_dirty(grid_x - obstacle_radius, grid_y - obstacle_radius,
+                                     grid_x + obstacle_radius + 1, grid_y + obstacle_radius + 1)
+            
+            # Nothing changed since the last update
+            if self._dirty_bbox is None:
+                return
+            
+            # Inflation and clearance costs spread changes further out
+            region = self._pad_bbox(self._dirty_bbox, self.influence_radius())
+            self._dirty_bbox = None
             
-            # Inflate obstacles for safety
-            self.inflate_obstacles()
+            # Inflate obstacles and update cost map for safety
+            self.rebuild_costmap(region)
             
-            # Update cost map
-            self.update_cost_map()
+            # Track where non-zero cells remain so the next fade stays local
+            if self._occupied_bbox is not None:
+                region = self._union_bbox(region, self._occupied_bbox)
+            self._occupied_bbox = self._nonzero_bbox(region)
             
         except Exception as e:
             logger.error(f"Error updating occupancy grid: {e}")
     
-    def inflate_obstacles(self):
-        """Inflate obstacles by vehicle radius for safe path planning"""
+    def _mark_dirty(self, x0, y0, x1, y1):
+        """Grow the dirty bounding box to cover the given (clipped) cell range"""
+        bbox = self._pad_bbox((x0, y0, x1, y1), 0)
+        if self._dirty_bbox is not None:
+            bbox = self._union_bbox(self._dirty_bbox, bbox)
+        self._dirty_bbox = bbox
+    
+    def _pad_bbox(self, bbox, padding):
+        """Pad a bounding box by a number of cells, clipped to the grid"""
+        x0, y0, x1, y1 = bbox
+        return (max(0, x0 - padding), max(0, y0 - padding),
+                min(self.map_width, x1 + padding), min(self.map_height, y1 + padding))
+    
+    def _union_bbox(self, a, b):
+        """Smallest bounding box containing both boxes"""
+        return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+    
+    def _nonzero_bbox(self, bbox):
+        """Shrink a bounding box to the non-zero occupancy cells inside it"""
+        x0, y0, x1, y1 = bbox
+        region = self.occupancy_grid[y0:y1, x0:x1]
+        rows = np.flatnonzero(region.any(axis=1))
+        if rows.size == 0:
+            return None
+        cols = np.flatnonzero(region.any(axis=0))
+        return (x0 + int(cols[0]), y0 + int(rows[0]), x0 + int(cols[-1]) + 1, y0 + int(rows[-1]) + 1)
+    
+    def influence_radius(self):
+        """Distance (in pixels) beyond which an obstacle no longer affects inflation or cost"""
+        return max(self.inflation_radius, self.vehicle_radius + int(2 * self.cost_falloff))
+    
+    def obstacle_distance(self, region=None):
+        """Euclidean distance (in pixels) from each cell in region to the nearest obstacle"""
+        x0, y0, x1, y1 = region or (0, 0, self.map_width, self.map_height)
+        
+        # Obstacles up to influence_radius outside the region still matter
+        sx0, sy0, sx1, sy1 = self._pad_bbox((x0, y0, x1, y1), self.influence_radius())
+        obstacles = self.occupancy_grid[sy0:sy1, sx0:sx1] > OBSTACLE_THRESHOLD
+        
+        if not obstacles.any():
+            return np.full((y1 - y0, x1 - x0), np.inf)
+        
+        distance = distance_transform_edt(~obstacles)
+        return distance[y0 - sy0:y1 - sy0, x0 - sx0:x1 - sx0]
+    
+    def rebuild_costmap(self, region=None):
+        """Rebuild obstacle inflation and cost map from a single distance field"""
         try:
-            inflated_grid = self.occupancy_grid.copy()
+            distance = self.obstacle_distance(region)
+            self.inflate_obstacles(region, distance)
+            self.update_cost_map(region, distance)
             
-            for y in range(self.map_height):
-                for x in range(self.map_width):
-                    if self.occupancy_grid[y, x] > 0.5:  # Obstacle
-                        # Inflate around this obstacle
-                        for dx in range(-self.inflation_radius, self.inflation_radius + 1):
-                            for dy in range(-self.inflation_radius, self.inflation_radius + 1):
-                                if dx*dx + dy*dy <= self.inflation_radius*self.inflation_radius:
-                                    nx, ny = x + dx, y + dy
-                                    if 0 <= nx < self.map_width and 0 <= ny < self.map_height:
-                                        inflated_grid[ny, nx] = max(inflated_grid[ny, nx], 0.8)
+        except Exception as e:
+            logger.error(f"Error rebuilding cost map: {e}")
+    
+    def inflate_obstacles(self, region=None, distance=None):
+        """Inflate obstacles by vehicle radius for safe path planning"""
+        try:
+            x0, y0, x1, y1 = region or (0, 0, self.map_width, self.map_height)
+            if distance is None:
+                distance = self.obstacle_distance(region)
             
-            self.occupancy_grid = inflated_grid
+            grid = self.occupancy_grid[y0:y1, x0:x1]
+            np.maximum(grid, INFLATED, out=grid, where=distance <= self.inflation_radius)
             
         except Exception as e:
             logger.error(f"Error inflating obstacles: {e}")
     
-    def update_cost_map(self):
-        """Update cost map based on occupancy grid"""
+    def update_cost_map(self, region=None, distance=None):
+        """Update cost map based on clearance from obstacles"""
         try:
-            # Base cost is 1.0 for free space
-            self.cost_map = np.ones_like(self.occupancy_grid)
-            
-            # Increase cost near obstacles
-            for y in range(self.map_height):
-                for x in range(self.map_width):
-                    if self.occupancy_grid[y, x] > 0.9:  # Obstacle
-                        self.cost_map[y, x] = 1000.0  # Very high cost
-                    elif self.occupancy_grid[y, x] > 0.5:  # Near obstacle
-                        self.cost_map[y, x] = 10.0  # High cost
-                    elif self.occupancy_grid[y, x] > 0.1:  # Uncertain area
-                        self.cost_map[y, x] = 2.0  # Moderate cost
+            x0, y0, x1, y1 = region or (0, 0, self.map_width, self.map_height)
+            if distance is None:
+                distance = self.obstacle_distance(region)
+            occupancy = self.occupancy_grid[y0:y1, x0:x1]
+            cost = self.cost_map[y0:y1, x0:x1]
+            
+            # Base cost is 1 for free space, rising smoothly as clearance shrinks
+            work = self._cost_scratch[:y1 - y0, :x1 - x0]
+            np.subtract(distance, self.vehicle_radius, out=work, casting='same_kind')
+            np.maximum(work, 1.0, out=work)
+            np.divide(self.cost_falloff, work, out=work)
+            work += 1.0
+            np.rint(work, out=work)
+            np.copyto(cost, work, casting='unsafe')
+            
+            cost[(occupancy > UNCERTAIN_THRESHOLD) & (cost < 2)] = 2  # Uncertain area: moderate cost
+            cost[distance < self.vehicle_radius] = 1000  # Obstacle within vehicle radius: very high cost
             
         except Exception as e:
             logger.error(f"Error updating cost map: {e}")
@@ -149,17 +242,13 @@ class PathPlanner:
                 # Check bounds
                 if 0 <= nx < self.map_width and 0 <= ny < self.map_height:
                     # Check if not obstacle
-                    if self.occupancy_grid[ny, nx] < 0.9:
+                    if self.occupancy_grid[ny, nx] <= BLOCKED_THRESHOLD:
                         neighbors.append((nx, ny))
         
         return neighbors
     
-    def astar_path_planning(self, start, goal):
-        """A* path planning algorithm"""
-        logger.info(f"🗺️ Planning path from {start} to {goal} using A*")
-        
-        start_time = time.time()
-        
+    def _grid_endpoints(self, start, goal):
+        """Convert start/goal to grid cells, or None if either is out of bounds or blocked"""
         # Convert to grid coordinates
         start_grid = (int(start[0] / self.resolution), int(start[1] / self.resolution))
         goal_grid = (int(goal[0] / self.resolution), int(goal[1] / self.resolution))
@@ -173,14 +262,27 @@ class PathPlanner:
             logger.error("Goal position out of bounds")
             return None
         
-        if self.occupancy_grid[start_grid[1], start_grid[0]] > 0.9:
+        if self.occupancy_grid[start_grid[1], start_grid[0]] > BLOCKED_THRESHOLD:
             logger.error("Start position is in obstacle")
             return None
         
-        if self.occupancy_grid[goal_grid[1], goal_grid[0]] > 0.9:
+        if self.occupancy_grid[goal_grid[1], goal_grid[0]] > BLOCKED_THRESHOLD:
             logger.error("Goal position is in obstacle")
             return None
         
+        return start_grid, goal_grid
+    
+    def astar_path_planning(self, start, goal):
+        """A* path planning algorithm"""
+        logger.info(f"🗺️ Planning path from {start} to {goal} using A*")
+        
+        start_time = time.time()
+        
+        endpoints = self._grid_endpoints(start, goal)
+        if endpoints is None:
+            return None
+        start_grid, goal_grid = endpoints
+        
         # A* algorithm
         open_set = []
         heapq.heappush(open_set, (0, start_grid))
@@ -219,7 +321,7 @@ class PathPlanner:
                     move_cost = 1.414  # Diagonal movement
                 
                 # Add terrain cost
-                terrain_cost = self.cost_map[neighbor[1], neighbor[0]]
+                terrain_cost = float(self.cost_map[neighbor[1], neighbor[0]])
                 tentative_g_score = g_score[current] + move_cost * terrain_cost
                 
                 if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
@@ -237,15 +339,14 @@ class PathPlanner:
         
         start_time = time.time()
         
-        class RRTNode:
-            def __init__(self, x, y):
-                self.x = x
-                self.y = y
-                self.parent = None
+        # Tree stored as parallel arrays (node i at xs[i], ys[i], parent index parents[i])
+        xs = np.empty(max_iterations + 1, dtype=np.float64)
+        ys = np.empty(max_iterations + 1, dtype=np.float64)
+        parents = np.full(max_iterations + 1, -1, dtype=np.int32)
         
         # Initialize tree with start node
-        start_node = RRTNode(start[0], start[1])
-        nodes = [start_node]
+        xs[0], ys[0] = start[0], start[1]
+        node_count = 1
         
         step_size = 20.0  # meters
         goal_threshold = 10.0  # meters
@@ -264,37 +365,34 @@ class PathPlanner:
                 rand_y = random.uniform(0, self.map_height * self.resolution)
             
             # Find nearest node
-            min_dist = float('inf')
-            nearest_node = None
-            for node in nodes:
-                dist = math.sqrt((node.x - rand_x)**2 + (node.y - rand_y)**2)
-                if dist < min_dist:
-                    min_dist = dist
-                    nearest_node = node
+            dist_sq = (xs[:node_count] - rand_x)**2 + (ys[:node_count] - rand_y)**2
+            nearest = int(np.argmin(dist_sq))
+            nearest_x, nearest_y = float(xs[nearest]), float(ys[nearest])
+            min_dist = math.sqrt(dist_sq[nearest])
             
             # Create new node in direction of random point
             if min_dist > step_size:
-                theta = math.atan2(rand_y - nearest_node.y, rand_x - nearest_node.x)
-                new_x = nearest_node.x + step_size * math.cos(theta)
-                new_y = nearest_node.y + step_size * math.sin(theta)
+                theta = math.atan2(rand_y - nearest_y, rand_x - nearest_x)
+                new_x = nearest_x + step_size * math.cos(theta)
+                new_y = nearest_y + step_size * math.sin(theta)
             else:
                 new_x, new_y = rand_x, rand_y
             
             # Check if path to new node is collision-free
-            if self.is_path_collision_free((nearest_node.x, nearest_node.y), (new_x, new_y)):
-                new_node = RRTNode(new_x, new_y)
-                new_node.parent = nearest_node
-                nodes.append(new_node)
+            if self.is_path_collision_free((nearest_x, nearest_y), (new_x, new_y)):
+                xs[node_count], ys[node_count] = new_x, new_y
+                parents[node_count] = nearest
+                node_count += 1
                 
                 # Check if we reached the goal
                 goal_dist = math.sqrt((new_x - goal[0])**2 + (new_y - goal[1])**2)
                 if goal_dist < goal_threshold:
                     # Reconstruct path
                     path = []
-                    current = new_node
-                    while current:
-                        path.append((current.x, current.y))
-                        current = current.parent
+                    current = node_count - 1
+                    while current >= 0:
+                        path.append((float(xs[current]), float(ys[current])))
+                        current = parents[current]
                     
                     path.reverse()
                     path.append(goal)  # Add exact goal
@@ -308,39 +406,27 @@ class PathPlanner:
     def is_path_collision_free(self, start, end):
         """Check if path between two points is collision-free"""
         try:
-            # Bresenham's line algorithm
+            occ = self.occupancy_grid
             x0, y0 = int(start[0] / self.resolution), int(start[1] / self.resolution)
             x1, y1 = int(end[0] / self.resolution), int(end[1] / self.resolution)
             
-            dx = abs(x1 - x0)
-            dy = abs(y1 - y0)
-            sx = 1 if x0 < x1 else -1
-            sy = 1 if y0 < y1 else -1
-            err = dx - dy
+            # Single-cell segment
+            n = max(abs(x1 - x0), abs(y1 - y0)) + 1
+            if n == 1:
+                return (0 <= x0 < self.map_width and 0 <= y0 < self.map_height
+                        and occ[y0, x0] <= BLOCKED_THRESHOLD)
             
-            x, y = x0, y0
+            # Sample one cell per step along the major axis (same cells Bresenham visits)
+            xs = np.rint(np.linspace(x0, x1, n)).astype(np.int32)
+            ys = np.rint(np.linspace(y0, y1, n)).astype(np.int32)
             
-            while True:
-                # Check bounds
-                if not (0 <= x < self.map_width and 0 <= y < self.map_height):
-                    return False
-                
-                # Check collision
-                if self.occupancy_grid[y, x] > 0.9:
-                    return False
-                
-                if x == x1 and y == y1:
-                    break
-                
-                e2 = 2 * err
-                if e2 > -dy:
-                    err -= dy
-                    x += sx
-                if e2 < dx:
-                    err += dx
-                    y += sy
+            # Check bounds
+            if (xs.min() < 0 or xs.max() >= self.map_width or
+                    ys.min() < 0 or ys.max() >= self.map_height):
+                return False
             
-            return True
+            # Check collision
+            return bool(occ[ys, xs].max() <= BLOCKED_THRESHOLD)
             
         except Exception as e:
             logger.error(f"Error checking path collision: {e}")
@@ -386,68 +472,63 @@ class PathPlanner:
             logger.error(f"Unknown path planning algorithm: {algorithm}")
             return None
     
+    def segment_lengths(self, path):
+        """Euclidean length of every path segment as a NumPy array"""
+        points = np.asarray(path, dtype=np.float64)
+        diffs = points[1:] - points[:-1]
+        return np.sqrt((diffs * diffs).sum(axis=1))
+    
     def calculate_path_cost(self, path):
         """Calculate total cost of a path"""
         if not path or len(path) < 2:
             return 0
         
-        total_cost = 0
-        for i in range(len(path) - 1):
-            # Distance cost
-            distance = math.sqrt(
-                (path[i+1][0] - path[i][0])**2 + 
-                (path[i+1][1] - path[i][1])**2
-            )
-            
-            # Terrain cost (sample along path)
-            mid_x = (path[i][0] + path[i+1][0]) / 2
-            mid_y = (path[i][1] + path[i+1][1]) / 2
-            grid_x = int(mid_x / self.resolution)
-            grid_y = int(mid_y / self.resolution)
-            
-            terrain_cost = 1.0
-            if 0 <= grid_x < self.map_width and 0 <= grid_y < self.map_height:
-                terrain_cost = self.cost_map[grid_y, grid_x]
-            
-            total_cost += distance * terrain_cost
+        points = np.asarray(path, dtype=np.float64)
+        
+        # Distance cost
+        distances = self.segment_lengths(points)
+        
+        # Terrain cost (sampled at segment midpoints)
+        mids = (points[1:] + points[:-1]) * 0.5 / self.resolution
+        grid_x = mids[:, 0].astype(np.int32)
+        grid_y = mids[:, 1].astype(np.int32)
+        in_bounds = ((grid_x >= 0) & (grid_x < self.map_width) &
+                     (grid_y >= 0) & (grid_y < self.map_height))
         
-        return total_cost
+        terrain_cost = np.ones(len(distances), dtype=np.float64)
+        terrain_cost[in_bounds] = self.cost_map[grid_y[in_bounds], grid_x[in_bounds]]
+        
+        return float((distances * terrain_cost).sum())
     
     def generate_velocity_profile(self, path):
         """Generate velocity profile for path following"""
         if not path or len(path) < 2:
             return []
         
-        velocities = []
+        points = np.asarray(path, dtype=np.float64)
         
-        for i in range(len(path)):
-            if i == 0 or i == len(path) - 1:
-                # Start and end with zero velocity
-                velocities.append(0.0)
-            else:
-                # Calculate curvature
-                p1 = np.array(path[i-1])
-                p2 = np.array(path[i])
-                p3 = np.array(path[i+1])
-                
-                # Vectors
-                v1 = p2 - p1
-                v2 = p3 - p2
-                
-                # Angle between vectors
-                angle = math.acos(np.clip(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)), -1, 1))
-                curvature = abs(math.pi - angle)
-                
-                # Velocity based on curvature
-                max_vel = self.max_speed
-                if curvature > 0.1:  # Sharp turn
-                    max_vel *= 0.3
-                elif curvature > 0.05:  # Moderate turn
-                    max_vel *= 0.6
-                
-                velocities.append(max_vel)
+        # Start and end with zero velocity
+        velocities = np.zeros(len(points), dtype=np.float64)
+        
+        # Vectors into and out of every interior waypoint
+        v1 = points[1:-1] - points[:-2]
+        v2 = points[2:] - points[1:-1]
+        norms = np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+        
+        # Angle between vectors (degenerate segments count as straight)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_angle = np.clip((v1 * v2).sum(axis=1) / norms, -1, 1)
+        curvature = np.abs(math.pi - np.arccos(cos_angle))
+        curvature[norms == 0] = 0.0
         
-        return velocities
+        # Velocity based on curvature
+        velocities[1:-1] = np.where(
+            curvature > 0.1, self.max_speed * 0.3,  # Sharp turn
+            np.where(curvature > 0.05, self.max_speed * 0.6,  # Moderate turn
+                     self.max_speed)
+        )
+        
+        return velocities.tolist()
     
     def export_path_data(self, path, algorithm_used='unknown'):
         """Export path data for visualization and analysis"""
@@ -458,10 +539,7 @@ class PathPlanner:
             'path': path,
             'algorithm': algorithm_used,
             'waypoint_count': len(path),
-            'total_distance': sum(
-                math.sqrt((path[i+1][0] - path[i][0])**2 + (path[i+1][1] - path[i][1])**2)
-                for i in range(len(path) - 1)
-            ),
+            'total_distance': float(self.segment_lengths(path).sum()),
             'total_cost': self.calculate_path_cost(path),
             'velocity_profile': self.generate_velocity_profile(path),
             'timestamp': time.time()
@@ -471,6 +549,7 @@ class PathFollower:
     def __init__(self, path_planner):
         self.path_planner = path_planner
         self.current_path = None
+        self.current_path_array = None  # (N, 2) copy of current_path for vectorized lookups
         self.current_waypoint_index = 0
         self.waypoint_tolerance = 2.0  # meters
         
@@ -482,6 +561,7 @@ class PathFollower:
     def set_path(self, path):
         """Set new path to follow"""
         self.current_path = path
+        self.current_path_array = np.asarray(path, dtype=np.float64).reshape(-1, 2)
         self.current_waypoint_index = 0
         logger.info(f"🗺️ New path set with {len(path)} waypoints")
     
@@ -515,19 +595,16 @@ class PathFollower:
             heading_error = target_angle - math.radians(current_heading)
             
             # Normalize heading error
-            while heading_error > math.pi:
-                heading_error -= 2 * math.pi
-            while heading_error < -math.pi:
-                heading_error += 2 * math.pi
+            heading_error = math.atan2(math.sin(heading_error), math.cos(heading_error))
             
             # Calculate steering command
-            if abs(heading_error) > math.radians(45):  # Large heading error
+            if abs(heading_error) > LARGE_HEADING_ERROR:  # Large heading error
                 if heading_error > 0:
                     action = 'turn_left'
                 else:
                     action = 'turn_right'
                 speed = 0.3  # Slow down for sharp turns
-            elif abs(heading_error) > math.radians(10):  # Moderate heading error
+            elif abs(heading_error) > MODERATE_HEADING_ERROR:  # Moderate heading error
                 action = 'straight'
                 speed = 0.6
             else:  # Small heading error
@@ -536,12 +613,11 @@ class PathFollower:
             
             # Check if we've reached current waypoint
             current_waypoint = self.current_path[self.current_waypoint_index]
-            distance_to_waypoint = math.sqrt(
-                (current_position[0] - current_waypoint[0])**2 + 
-                (current_position[1] - current_waypoint[1])**2
-            )
+            wx = current_position[0] - current_waypoint[0]
+            wy = current_position[1] - current_waypoint[1]
+            distance_sq = wx*wx + wy*wy
             
-            if distance_to_waypoint < self.waypoint_tolerance:
+            if distance_sq < self.waypoint_tolerance * self.waypoint_tolerance:
                 self.current_waypoint_index += 1
                 logger.info(f"🗺️ Reached waypoint {self.current_waypoint_index}/{len(self.current_path)}")
                 
@@ -554,7 +630,7 @@ class PathFollower:
                 'speed': speed,
                 'steering': math.degrees(heading_error),
                 'lookahead_point': lookahead_point,
-                'distance_to_waypoint': distance_to_waypoint,
+                'distance_to_waypoint': math.sqrt(distance_sq),
                 'waypoint_index': self.current_waypoint_index
             }
             
@@ -568,18 +644,33 @@ class PathFollower:
             return None
         
         try:
-            # Start from current waypoint
-            for i in range(self.current_waypoint_index, len(self.current_path) - 1):
-                p1 = self.current_path[i]
-                p2 = self.current_path[i + 1]
-                
-                # Check if lookahead circle intersects with path segment
-                intersection = self.line_circle_intersection(
-                    current_position, lookahead_distance, p1, p2
-                )
-                
-                if intersection:
-                    return intersection
+            # All segments from the current waypoint onwards
+            points = self.current_path_array[self.current_waypoint_index:]
+            p1 = points[:-1]
+            d = points[1:] - p1
+            f = p1 - np.asarray(current_position, dtype=np.float64)
+            
+            # Intersect the lookahead circle with every segment at once
+            a = (d * d).sum(axis=1)
+            b = 2 * (f * d).sum(axis=1)
+            c = (f * f).sum(axis=1) - lookahead_distance * lookahead_distance
+            discriminant = b * b - 4 * a * c
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                root = np.sqrt(np.maximum(discriminant, 0))
+                t1 = (-b - root) / (2 * a)
+                t2 = (-b + root) / (2 * a)
+            
+            # Prefer the nearer intersection on each segment, as line_circle_intersection does
+            valid = (discriminant >= 0) & (a > 0)
+            t1_ok = valid & (t1 >= 0) & (t1 <= 1)
+            t2_ok = valid & (t2 >= 0) & (t2 <= 1)
+            hits = t1_ok | t2_ok
+            
+            if hits.any():
+                i = int(np.argmax(hits))
+                t = t1[i] if t1_ok[i] else t2[i]
+                return (float(p1[i, 0] + t * d[i, 0]), float(p1[i, 1] + t * d[i, 1]))
             
             # If no intersection found, return last waypoint
             return self.current_path[-1]
@@ -592,13 +683,17 @@ class PathFollower:
         """Find intersection of line segment with circle"""
         try:
             # Vector from p1 to p2
-            d = np.array([p2[0] - p1[0], p2[1] - p1[1]])
-            # Vector from p1 to circle center
-            f = np.array([p1[0] - center[0], p1[1] - center[1]])
-            
-            a = np.dot(d, d)
-            b = 2 * np.dot(f, d)
-            c = np.dot(f, f) - radius * radius
+            dx = p2[0] - p1[0]
+            dy = p2[1] - p1[1]
+            # Vector from circle center to p1
+            fx = p1[0] - center[0]
+            fy = p1[1] - center[1]
+            
+            a = dx*dx + dy*dy
+            if a == 0:
+                return None  # Degenerate segment
+            b = 2 * (fx*dx + fy*dy)
+            c = fx*fx + fy*fy - radius*radius
             
             discriminant = b * b - 4 * a * c
             
@@ -612,10 +707,9 @@ class PathFollower:
             t2 = (-b + discriminant) / (2 * a)
             
             # Check if intersections are on line segment
-            for t in [t1, t2]:
+            for t in (t1, t2):
                 if 0 <= t <= 1:
-                    intersection = (p1[0] + t * d[0], p1[1] + t * d[1])
-                    return intersection
+                    return (p1[0] + t * dx, p1[1] + t * dy)
             
             return None
             
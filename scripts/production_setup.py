@@ -6,20 +6,132 @@ This script configures the system for production deployment with auto-start capa
 
 import os
 import sys
+import pwd
+import grp
+import stat
+import shutil
+import shlex
+import hashlib
+import platform
 import subprocess
 import json
+import venv
 import logging
 from pathlib import Path
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
 import sqlite3
+import time
 from datetime import datetime
 
+# Prefer orjson for config serialization, fall back to the standard library
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    force=True
 )
 logger = logging.getLogger(__name__)
 
+# Skip 'apt-get update' when the package lists were refreshed this recently (seconds)
+APT_LISTS_MAX_AGE = 3600
+
+# Touched by a successful 'apt-get update' (the periodic stamp also covers the daily timer)
+APT_UPDATE_STAMPS = ['/var/lib/apt/periodic/update-success-stamp', '/var/lib/apt/lists']
+
+# Pipeline package downloads per mirror host; stated explicitly so a local
+# apt.conf override (e.g. Pipeline-Depth 0 for broken proxies) doesn't serialize them
+APT_DOWNLOAD_OPTIONS = ['-o', 'Acquire::Queue-Mode=host', '-o', 'Acquire::http::Pipeline-Depth=10']
+
+# Wheel cache shared across venv rebuilds
+PIP_CACHE_DIR = '/var/cache/smartrover-pip'
+
+# Archives of fully built venvs, keyed by package list and interpreter
+VENV_CACHE_DIR = '/var/cache/smartrover'
+
+# uv's content-addressed cache; packages are hardlinked from here into the venv
+UV_CACHE_DIR = '/var/cache/smartrover-uv'
+
+# Waypoint insert shared by every seeding call, so sqlite3's statement cache
+# keeps one compiled plan for it
+INSERT_WAYPOINT_SQL = '''
+    INSERT OR IGNORE INTO waypoints (id, name, x, y, type, status, priority)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Systemd unit for the vehicle server
+SERVER_SERVICE_TEMPLATE = Template("""[Unit]
+Description=SmartRover Mining Vehicle Server
+After=network.target pigpiod.service
+Wants=network.target pigpiod.service
+
+[Service]
+Type=notify
+NotifyAccess=main
+WatchdogSec=30
+User=$user
+Group=$user
+WorkingDirectory=$base_dir
+Environment=PATH=$base_dir/venv/bin
+Environment=PYTHONPATH=$base_dir
+ExecStart=$base_dir/venv/bin/python $base_dir/standalone_vehicle_server.py
+Restart=always
+RestartSec=10
+MemoryMax=512M
+TasksMax=128
+LimitNOFILE=4096
+StandardOutput=journal
+StandardError=journal
+
+[Install]
+WantedBy=multi-user.target
+""")
+
+# Management scripts
+STATUS_SCRIPT = """#!/bin/bash
+echo "SmartRover Mining Vehicle Status"
+echo "================================"
+echo
+echo "Service Status:"
+systemctl is-active smartrover && echo "✓ SmartRover: Running" || echo "✗ SmartRover: Stopped"
+echo
+echo "System Info:"
+echo "IP Address: $(hostname -I | awk '{print $1}')"
+echo "Uptime: $(uptime -p)"
+echo
+echo "Access dashboard at: http://$(hostname -I | awk '{print $1}'):5000"
+"""
+
+START_SCRIPT = """#!/bin/bash
+echo "Starting SmartRover service..."
+sudo systemctl start smartrover
+sudo systemctl status smartrover
+"""
+
+STOP_SCRIPT = """#!/bin/bash
+echo "Stopping SmartRover service..."
+sudo systemctl stop smartrover
+sudo systemctl status smartrover
+"""
+
+# Multi-threaded zstd keeps all cores busy instead of single-threaded gzip
+BACKUP_SCRIPT = """#!/bin/bash
+BACKUP_DIR="/var/lib/smartrover/backups"
+DATE=$(date +%Y%m%d_%H%M%S)
+echo "Backing up SmartRover data and configuration..."
+tar --use-compress-program='zstd -T0 -3' -C / --exclude='var/lib/smartrover/backups' \\
+    -cf "$BACKUP_DIR/smartrover_backup_$DATE.tar.zst" var/lib/smartrover etc/smartrover
+# Keep the 5 most recent backups
+ls -1t "$BACKUP_DIR"/smartrover_backup_*.tar.zst | tail -n +6 | xargs -r rm -f
+echo "Backup saved to $BACKUP_DIR/smartrover_backup_$DATE.tar.zst"
+"""
+
 class ProductionSetup:
     def __init__(self):
         self.project_root = Path(__file__).parent.parent
@@ -27,26 +139,31 @@ class ProductionSetup:
         self.config_dir = Path('/etc/smartrover')
         self.log_dir = Path('/var/log/smartrover')
         self.data_dir = Path('/var/lib/smartrover')
+        self.run_dir = Path('/var/run/smartrover')
         self.services_dir = Path('/etc/systemd/system')
         self.user = 'smartrover'
+        self.services = ['smartrover.service']
+        self.units_changed = True  # Whether systemd needs a daemon-reload
+        self._owner_ids = None  # (uid, gid) of self.user, looked up once
+        self.uv_path = shutil.which('uv')  # Use uv's pip interface when it's installed
         
-    def run_command(self, command, description, fail_on_error=True):
+    def run_command(self, command, description, fail_on_error=True, env=None):
         """Run a command with error handling"""
-        logger.info(f"{description}...")
+        logger.info("%s...", description)
+        # Never go through /bin/sh: one less fork+exec per command and no quoting surprises
+        if isinstance(command, str):
+            command = shlex.split(command)
+        
         try:
-            if isinstance(command, str):
-                result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-            else:
-                result = subprocess.run(command, check=True, capture_output=True, text=True)
-            logger.info(f"✓ {description} completed successfully")
+            result = subprocess.run(command, check=True, capture_output=True, text=True, env=env)
+            logger.info("✓ %s completed successfully", description)
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             if fail_on_error:
-                logger.error(f"✗ {description} failed: {e}")
-                return False
+                logger.error("✗ %s failed: %s", description, e)
             else:
-                logger.warning(f"⚠ {description} failed but continuing: {e}")
-                return True
+                logger.warning("⚠ %s failed but continuing: %s", description, e)
+            return False
     
     def check_root(self):
         """Check if running as root"""
@@ -55,24 +172,79 @@ class ProductionSetup:
             sys.exit(1)
     
     def install_system_dependencies(self):
-        """Install minimal system dependencies"""
+        """Install minimal system dependencies needed to build the Python environment"""
         logger.info("Installing system dependencies...")
         
-        packages = [
+        self.install_packages([
             'python3-pip',
             'python3-venv',
             'python3-dev',
             'build-essential',
+            'zstd'  # Compresses the cached venv archive
+        ])
+    
+    def install_system_tools(self):
+        """Install runtime command-line tools (nothing in the Python setup depends on them)"""
+        logger.info("Installing system tools...")
+        
+        self.install_packages([
             'sqlite3',
             'curl',
-            'wget',
-            'git'
-        ]
-        
-        self.run_command('apt update', "Updating package lists", fail_on_error=False)
-        
-        for package in packages:
-            self.run_command(f'apt install -y {package}', f"Installing {package}", fail_on_error=False)
+            'pigpiod'  # Ultrasonic echo timing daemon
+        ])
+    
+    def install_packages(self, packages):
+        """Install the missing packages from the list in one apt transaction"""
+        # Only hand apt the packages that aren't installed yet
+        installed = self.installed_packages()
+        missing = [package for package in packages if package not in installed]
+        if not missing:
+            logger.info("Already installed: %s", ', '.join(packages))
+            return
+        
+        apt_env = {**os.environ, 'DEBIAN_FRONTEND': 'noninteractive'}
+        
+        if self.apt_lists_fresh():
+            logger.info("Package lists are up to date, skipping update")
+        else:
+            self.run_command(['apt-get', 'update'] + APT_DOWNLOAD_OPTIONS, "Updating package lists",
+                             fail_on_error=False, env=apt_env)
+        
+        # One transaction so dpkg triggers run once for the whole batch
+        # Conffile prompts would block the unattended install; keep local edits, take defaults otherwise
+        apt_install = ['apt-get', 'install', '-y', '--no-install-recommends', '-o', 'Dpkg::Use-Pty=0',
+                       '-o', 'Dpkg::Options::=--force-confdef',
+                       '-o', 'Dpkg::Options::=--force-confold'] + APT_DOWNLOAD_OPTIONS
+        if self.run_command(apt_install + missing, f"Installing {', '.join(missing)}", env=apt_env):
+            return
+        
+        # Fall back to one package at a time so a single unavailable package doesn't block the rest
+        for package in missing:
+            self.run_command(apt_install + [package], f"Installing {package}",
+                             fail_on_error=False, env=apt_env)
+    
+    def installed_packages(self):
+        """Names of all installed Debian packages, from a single dpkg-query run"""
+        try:
+            output = subprocess.run(
+                ['dpkg-query', '-W', '-f=${Package} ${db:Status-Status}\n'],
+                capture_output=True, text=True
+            ).stdout
+        except OSError:
+            return set()
+        
+        return {line.split()[0] for line in output.splitlines() if line.endswith(' installed')}
+    
+    def apt_lists_fresh(self):
+        """Check whether apt package lists were updated recently"""
+        last_update = 0
+        for path in APT_UPDATE_STAMPS:
+            try:
+                last_update = max(last_update, os.path.getmtime(path))
+            except OSError:
+                continue
+        
+        return time.time() - last_update < APT_LISTS_MAX_AGE
     
     def setup_python_environment(self):
         """Setup Python virtual environment with flexible versioning"""
@@ -80,23 +252,18 @@ class ProductionSetup:
         
         venv_path = self.base_dir / 'venv'
         
-        # Create virtual environment
-        self.run_command([sys.executable, '-m', 'venv', str(venv_path)], 
-                        "Creating virtual environment")
-        
         # Install Python dependencies without version constraints
         pip_path = venv_path / 'bin' / 'pip'
         
-        self.run_command([str(pip_path), 'install', '--upgrade', 'pip'], 
-                        "Upgrading pip", fail_on_error=False)
-        
         # Core packages that are essential
         essential_packages = [
             'flask',
             'flask-cors', 
             'numpy',
             'psutil',
-            'requests'
+            'requests',
+            'orjson',
+            'waitress'
         ]
         
         # Optional packages that enhance functionality
@@ -110,34 +277,177 @@ class ProductionSetup:
             'pandas',
             'Pillow',
             'scipy',
-            'bleak'
+            'bleak',
+            'pigpio'
         ]
         
-        # Install essential packages
-        for package in essential_packages:
-            self.run_command([str(pip_path), 'install', package], 
-                           f"Installing essential {package}")
+        # A hash-locked requirements file (pip-compile --generate-hashes) skips the
+        # resolver entirely; only the hash checks remain per package
+        lock_file = self.project_root / 'scripts' / 'requirements.lock'
+        
+        # Identical package lists on the same interpreter produce identical venvs, so a
+        # previous build can be unpacked instead of installing anything
+        cache_key = self.venv_cache_key(essential_packages + optional_packages, lock_file)
+        cache_file = Path(VENV_CACHE_DIR) / f'venv-{cache_key}.tar.zst'
+        if cache_file.exists() and self.run_command(
+                ['tar', '--use-compress-program=zstd', '-xf', str(cache_file), '-C', str(self.base_dir)],
+                "Restoring cached virtual environment", fail_on_error=False):
+            logger.info("Python environment setup completed")
+            return
+        
+        # Create virtual environment in-process instead of re-launching the interpreter
+        logger.info("Creating virtual environment...")
+        try:
+            # uv installs into the venv from outside, so the venv doesn't need its own pip
+            venv.EnvBuilder(symlinks=True, with_pip=self.uv_path is None).create(str(venv_path))
+            logger.info("✓ Creating virtual environment completed successfully")
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.error("✗ Creating virtual environment failed: %s", e)
         
-        # Install optional packages (don't fail if they don't work)
-        for package in optional_packages:
-            self.run_command([str(pip_path), 'install', package], 
-                           f"Installing optional {package}", fail_on_error=False)
+        # Only a complete install is worth caching
+        if self.install_python_packages(pip_path, essential_packages, optional_packages, lock_file):
+            self.save_venv_cache(cache_file)
         
         logger.info("Python environment setup completed")
     
+    def install_python_packages(self, pip_path, essential_packages, optional_packages, lock_file):
+        """Install the package lists into the venv, returning True if every package went in"""
+        if lock_file.exists():
+            if self.pip_install(pip_path, ['--no-deps', '--require-hashes', '-r', str(lock_file)],
+                                "Installing locked Python packages", fail_on_error=False):
+                return True
+            logger.warning("⚠ Locked install failed, resolving packages instead")
+        
+        # Resolve the whole dependency set in a single pip run from one requirements file
+        requirements_file = self.base_dir / 'requirements.txt'
+        self.write_atomic(requirements_file, '\n'.join(essential_packages + optional_packages) + '\n')
+        
+        if self.pip_install(pip_path, ['-r', str(requirements_file)],
+                            "Installing Python packages", fail_on_error=False):
+            return True
+        
+        # Some optional package failed to resolve, fall back to essential batch then per-package
+        if not self.pip_install(pip_path, essential_packages,
+                                "Installing essential packages"):
+            for package in essential_packages:
+                self.pip_install(pip_path, [package], f"Installing essential {package}")
+        
+        # Install the optional packages that are still missing one by one (don't fail if they don't work)
+        installed = self.installed_distributions(pip_path)
+        for package in optional_packages:
+            if self.normalize_distribution(package) in installed:
+                continue
+            self.pip_install(pip_path, [package], f"Installing optional {package}", fail_on_error=False)
+        
+        return False
+    
+    def venv_cache_key(self, packages, lock_file):
+        """Hash of everything that determines the venv contents"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([
+            sorted(packages),
+            list(sys.version_info[:3]),
+            platform.machine()
+        ]).encode())
+        if lock_file.exists():
+            digest.update(lock_file.read_bytes())
+        return digest.hexdigest()[:16]
+    
+    def save_venv_cache(self, cache_file):
+        """Archive the freshly built venv for the next setup run
+        
+        The venv hard-codes its location, which is why base_dir stays fixed at /opt/smartrover.
+        """
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        if self.run_command(['tar', '--use-compress-program=zstd -T0', '-cf', str(tmp_file),
+                             '-C', str(self.base_dir), 'venv'],
+                            "Caching virtual environment", fail_on_error=False):
+            os.replace(tmp_file, cache_file)
+        else:
+            tmp_file.unlink(missing_ok=True)
+    
+    def pip_env(self):
+        """Environment for pip runs, sharing one wheel cache across rebuilds"""
+        return {
+            **os.environ,
+            'PIP_CACHE_DIR': PIP_CACHE_DIR,
+            'UV_CACHE_DIR': UV_CACHE_DIR,
+            'UV_LINK_MODE': 'hardlink',
+            'PIP_DISABLE_PIP_VERSION_CHECK': '1',
+            'PIP_NO_INPUT': '1'
+        }
+    
+    def installed_distributions(self, pip_path):
+        """Normalized names of the distributions already in the venv, from a single pip run"""
+        try:
+            output = subprocess.run(
+                self.pip_command(pip_path, 'list') + ['--format=freeze'],
+                capture_output=True, text=True, env=self.pip_env()
+            ).stdout
+        except OSError:
+            return set()
+        
+        return {self.normalize_distribution(line.split('==')[0]) for line in output.splitlines()}
+    
+    def normalize_distribution(self, name):
+        """PEP 503 name normalization, so 'RPi.GPIO' matches pip's listing"""
+        return name.lower().replace('_', '-').replace('.', '-')
+    
+    def pip_command(self, pip_path, subcommand):
+        """Base command for a pip subcommand in the venv, going through uv when available"""
+        if self.uv_path:
+            return [self.uv_path, 'pip', subcommand, '--python', str(pip_path.parent / 'python')]
+        return [str(pip_path), subcommand]
+    
+    def pip_install(self, pip_path, packages, description, fail_on_error=True):
+        """Install packages preferring prebuilt wheels, skipping bytecode compilation"""
+        if self.uv_path:
+            # uv resolves and downloads in parallel and never compiles bytecode by default
+            return self.run_command(self.pip_command(pip_path, 'install') + packages, description,
+                                    fail_on_error=fail_on_error, env=self.pip_env())
+        
+        pip_install = self.pip_command(pip_path, 'install') + ['--no-compile', '--prefer-binary']
+        
+        # Wheels only first; a miss is expected (e.g. RPi.GPIO has none), so it is only a warning
+        if self.run_command(pip_install + ['--only-binary=:all:'] + packages,
+                            f"{description} (wheels)", fail_on_error=False, env=self.pip_env()):
+            return True
+        
+        # No wheel available for this platform, allow source builds
+        return self.run_command(pip_install + packages, description,
+                                fail_on_error=fail_on_error, env=self.pip_env())
+    
     def create_system_user(self):
         """Create system user for the service"""
         logger.info("Creating system user...")
         
-        self.run_command([
-            'useradd', '--system', '--shell', '/bin/false',
-            '--home', str(self.data_dir), '--create-home',
-            self.user
-        ], "Creating system user", fail_on_error=False)
+        # Only groups that exist on this board and don't list the user yet
+        missing = self.missing_groups(['gpio', 'bluetooth', 'video', 'i2c', 'spi'])
+        group_args = ['-G', ','.join(missing)] if missing else []
         
-        # Add user to required groups (don't fail if groups don't exist)
-        self.run_command(['usermod', '-a', '-G', 'gpio,bluetooth,video,i2c,spi', self.user], 
-                        "Adding user to groups", fail_on_error=False)
+        try:
+            pwd.getpwnam(self.user)
+        except KeyError:
+            # New user gets its hardware groups in the same useradd call
+            self.run_command([
+                'useradd', '--system', '--shell', '/bin/false',
+                '--home', str(self.data_dir), '--create-home',
+                *group_args, self.user
+            ], "Creating system user", fail_on_error=False)
+            return
+        
+        logger.info("User %s already exists", self.user)
+        if missing:
+            self.run_command(['usermod', '-a', *group_args, self.user], 
+                            "Adding user to groups", fail_on_error=False)
+        else:
+            logger.info("User already in all available hardware groups")
+    
+    def missing_groups(self, groups):
+        """Return the existing groups from the list that the service user is not yet a member of"""
+        members = {group.gr_name: group.gr_mem for group in grp.getgrall()}
+        return [name for name in groups if name in members and self.user not in members[name]]
     
     def create_directories(self):
         """Create necessary directories"""
@@ -151,15 +461,52 @@ class ProductionSetup:
             self.data_dir / 'models',
             self.data_dir / 'maps',
             self.data_dir / 'backups',
-            Path('/var/run/smartrover')
+            self.run_dir
         ]
         
+        # Ownership and modes are applied in one pass by set_permissions
         for directory in directories:
             directory.mkdir(parents=True, exist_ok=True)
-            self.run_command(['chown', f'{self.user}:{self.user}', str(directory)], 
-                           f"Setting ownership for {directory}", fail_on_error=False)
-            self.run_command(['chmod', '755', str(directory)], 
-                           f"Setting permissions for {directory}", fail_on_error=False)
+        
+        logger.info("✓ Created %s directories", len(directories))
+    
+    def set_permissions(self):
+        """Hand installed files to the service user in a single in-process walk"""
+        logger.info("Setting file permissions...")
+        
+        try:
+            uid, gid = self.owner_ids()
+        except KeyError as e:
+            logger.warning("⚠ Setting file permissions failed but continuing: %s", e)
+            return
+        
+        count = 0
+        for root in [self.base_dir, self.config_dir, self.log_dir, self.data_dir, self.run_dir]:
+            try:
+                for dirpath, dirnames, filenames in os.walk(root):
+                    os.chown(dirpath, uid, gid)
+                    os.chmod(dirpath, 0o755)
+                    
+                    for filename in filenames:
+                        path = os.path.join(dirpath, filename)
+                        # Never follow symlinks (the venv links to the system interpreter)
+                        os.chown(path, uid, gid, follow_symlinks=False)
+                        st = os.lstat(path)
+                        if not stat.S_ISLNK(st.st_mode):
+                            executable = st.st_mode & 0o111 or (
+                                dirpath == str(self.base_dir) and filename.endswith('.py'))
+                            os.chmod(path, 0o755 if executable else 0o644)
+                        count += 1
+            except OSError as e:
+                logger.warning("⚠ Setting permissions under %s failed but continuing: %s", root, e)
+        
+        logger.info("✓ Set permissions on %s files", count)
+    
+    def owner_ids(self):
+        """Look up the service user's uid and gid once"""
+        if self._owner_ids is None:
+            self._owner_ids = (pwd.getpwnam(self.user).pw_uid, grp.getgrnam(self.user).gr_gid)
+        return self._owner_ids
     
     def copy_project_files(self):
         """Copy project files to installation directory"""
@@ -168,13 +515,15 @@ class ProductionSetup:
         # Copy Python scripts
         scripts_source = self.project_root / 'scripts'
         if scripts_source.exists():
-            self.run_command(f'cp -r {scripts_source}/* {self.base_dir}/', 
-                           "Copying scripts", fail_on_error=False)
-        
-        # Make scripts executable
-        for script in self.base_dir.glob('*.py'):
-            self.run_command(['chmod', '+x', str(script)], 
-                           f"Making {script.name} executable", fail_on_error=False)
+            # In-process copy; copy2 uses sendfile on Linux so the data never passes through Python
+            try:
+                shutil.copytree(scripts_source, self.base_dir, dirs_exist_ok=True,
+                                ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+                logger.info("✓ Copying scripts completed successfully")
+            except (OSError, shutil.Error) as e:
+                logger.warning("⚠ Copying scripts failed but continuing: %s", e)
+        
+        # Scripts are made executable by set_permissions in the same pass as their ownership
     
     def initialize_database(self):
         """Initialize the mining database with default data"""
@@ -182,9 +531,34 @@ class ProductionSetup:
         
         db_path = self.data_dir / 'mining_data.db'
         
-        conn = sqlite3.connect(str(db_path))
+        # Autocommit mode so the transaction below is controlled explicitly
+        conn = sqlite3.connect(str(db_path), isolation_level=None)
         cursor = conn.cursor()
         
+        # WAL mode is stored in the database file, so the vehicle services
+        # that open it later inherit cheap commits as well
+        cursor.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+            PRAGMA mmap_size=134217728;
+        ''')
+        
+        # Schema and seed data go in as one transaction with a single commit
+        # (executescript would commit early, so the DDL stays on execute)
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            self.seed_database(cursor)
+            cursor.execute('COMMIT')
+        except sqlite3.Error:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    
+    def seed_database(self, cursor):
+        """Create the tables and insert the default waypoints inside the caller's transaction"""
         # Create tables
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS waypoints (
@@ -222,37 +596,22 @@ class ProductionSetup:
             )
         ''')
         
-        # Insert default docking station
-        cursor.execute('''
-            INSERT OR IGNORE INTO waypoints (id, name, x, y, type, status, priority)
-            VALUES (1, 'Docking Station', 1000, 1000, 'dock', 'completed', 0)
-        ''')
-        
-        # Insert sample mining waypoints
-        sample_waypoints = [
-            ('Mining Point Alpha', 800, 800, 'mining', 'pending', 3),
-            ('Mining Point Beta', 1200, 800, 'mining', 'pending', 2),
-            ('Mining Point Gamma', 1000, 600, 'mining', 'pending', 1),
+        # Seed the docking station and sample mining waypoints in one batch;
+        # a None id lets SQLite assign the next rowid
+        seed_waypoints = [
+            (1, 'Docking Station', 1000, 1000, 'dock', 'completed', 0),
+            (None, 'Mining Point Alpha', 800, 800, 'mining', 'pending', 3),
+            (None, 'Mining Point Beta', 1200, 800, 'mining', 'pending', 2),
+            (None, 'Mining Point Gamma', 1000, 600, 'mining', 'pending', 1),
         ]
         
-        for waypoint in sample_waypoints:
-            cursor.execute('''
-                INSERT OR IGNORE INTO waypoints (name, x, y, type, status, priority)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', waypoint)
+        cursor.executemany(INSERT_WAYPOINT_SQL, seed_waypoints)
         
         # Log initial setup
         cursor.execute('''
             INSERT INTO system_logs (level, message, component)
             VALUES ('INFO', 'Database initialized with default waypoints', 'setup')
         ''')
-        
-        conn.commit()
-        conn.close()
-        
-        # Set ownership
-        self.run_command(['chown', f'{self.user}:{self.user}', str(db_path)], 
-                        "Setting database ownership", fail_on_error=False)
     
     def create_config_files(self):
         """Create production configuration files"""
@@ -277,123 +636,134 @@ class ProductionSetup:
         }
         
         config_file = self.config_dir / 'vehicle_config.json'
-        with open(config_file, 'w') as f:
-            json.dump(vehicle_config, f, indent=2)
+        self.write_json(config_file, vehicle_config)
+    
+    def write_json(self, path, data):
+        """Write data as indented JSON, atomically replacing path"""
+        if ORJSON_AVAILABLE:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        else:
+            content = (json.dumps(data, indent=2) + '\n').encode()
+        
+        self.write_atomic(path, content)
+    
+    def write_atomic(self, path, content, mode=0o644):
+        """Write content to a temporary file and rename it over path
+        
+        Returns False without rewriting when path already holds identical content.
+        Durability comes from the single os.sync() at the end of run_setup.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
         
-        self.run_command(['chown', f'{self.user}:{self.user}', str(config_file)], 
-                        "Setting config ownership", fail_on_error=False)
+        try:
+            if Path(path).read_bytes() == content:
+                os.chmod(path, mode)
+                logger.info("%s is up to date", path)
+                return False
+        except OSError:
+            pass
+        
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            os.fchmod(fd, mode)  # Also applies when a stale tmp file already existed
+            os.write(fd, content)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+        return True
     
     def create_systemd_services(self):
         """Create systemd service files for auto-start"""
         logger.info("Creating systemd services...")
         
         # Main server service
-        server_service = f"""[Unit]
-Description=SmartRover Mining Vehicle Server
-After=network.target
-Wants=network.target
-
-[Service]
-Type=simple
-User={self.user}
-Group={self.user}
-WorkingDirectory={self.base_dir}
-Environment=PATH={self.base_dir}/venv/bin
-Environment=PYTHONPATH={self.base_dir}
-ExecStart={self.base_dir}/venv/bin/python {self.base_dir}/standalone_vehicle_server.py
-Restart=always
-RestartSec=10
-StandardOutput=journal
-StandardError=journal
-
-[Install]
-WantedBy=multi-user.target
-"""
+        server_service = SERVER_SERVICE_TEMPLATE.substitute(user=self.user, base_dir=self.base_dir)
         
         # Write service file
-        with open(self.services_dir / 'smartrover.service', 'w') as f:
-            f.write(server_service)
-        
-        # Reload systemd and enable service
-        self.run_command(['systemctl', 'daemon-reload'], "Reloading systemd")
-        self.run_command(['systemctl', 'enable', 'smartrover.service'], "Enabling SmartRover service")
+        self.units_changed = self.write_atomic(self.services_dir / 'smartrover.service', server_service)
         
-        logger.info("Systemd service created and enabled for auto-start")
+        logger.info("Systemd service created")
+    
+    def enable_services(self):
+        """Reload systemd once, then enable and start all SmartRover units in a single call"""
+        if self.units_changed:
+            self.run_command(['systemctl', 'daemon-reload'], "Reloading systemd")
+        else:
+            logger.info("Unit files unchanged, skipping systemd reload")
+        
+        # With Type=notify this blocks until the server reports READY=1 and exits non-zero
+        # if it fails to start, so no separate status check is needed
+        if self.run_command(['systemctl', 'enable', '--now'] + self.services,
+                            "Enabling and starting SmartRover services"):
+            logger.info("Systemd services enabled for auto-start")
+        else:
+            logger.error("✗ Check 'journalctl -u smartrover' for startup errors")
     
     def create_management_scripts(self):
         """Create simple management scripts"""
         logger.info("Creating management scripts...")
         
-        # Status script
-        status_script = """#!/bin/bash
-echo "SmartRover Mining Vehicle Status"
-echo "================================"
-echo
-echo "Service Status:"
-systemctl is-active smartrover && echo "✓ SmartRover: Running" || echo "✗ SmartRover: Stopped"
-echo
-echo "System Info:"
-echo "IP Address: $(hostname -I | awk '{print $1}')"
-echo "Uptime: $(uptime -p)"
-echo
-echo "Access dashboard at: http://$(hostname -I | awk '{print $1}'):5000"
-"""
-        
-        # Start service script
-        start_script = """#!/bin/bash
-echo "Starting SmartRover service..."
-sudo systemctl start smartrover
-sudo systemctl status smartrover
-"""
-        
-        # Stop service script
-        stop_script = """#!/bin/bash
-echo "Stopping SmartRover service..."
-sudo systemctl stop smartrover
-sudo systemctl status smartrover
-"""
-        
         scripts = {
-            '/usr/local/bin/smartrover-status': status_script,
-            '/usr/local/bin/smartrover-start': start_script,
-            '/usr/local/bin/smartrover-stop': stop_script
+            '/usr/local/bin/smartrover-status': STATUS_SCRIPT,
+            '/usr/local/bin/smartrover-start': START_SCRIPT,
+            '/usr/local/bin/smartrover-stop': STOP_SCRIPT,
+            '/usr/local/bin/smartrover-backup': BACKUP_SCRIPT
         }
         
         for script_path, content in scripts.items():
-            with open(script_path, 'w') as f:
-                f.write(content)
-            self.run_command(['chmod', '+x', script_path], 
-                           f"Making {script_path} executable", fail_on_error=False)
+            self.write_atomic(script_path, content, mode=0o755)
     
-    def start_services(self):
-        """Start the SmartRover service"""
-        logger.info("Starting SmartRover service...")
-        
-        self.run_command(['systemctl', 'start', 'smartrover'], 
-                        "Starting SmartRover service", fail_on_error=False)
-        
-        # Wait a moment and check status
-        import time
-        time.sleep(3)
-        
-        self.run_command(['systemctl', 'status', 'smartrover', '--no-pager'], 
-                        "Checking service status", fail_on_error=False)
+    def run_parallel(self, steps, max_workers=4):
+        """Run independent I/O-bound setup steps concurrently and wait for all of them.
+        
+        A step may also be a tuple of callables that depend on each other; those
+        run in order on the same worker.
+        """
+        def run_chain(chain):
+            for step in chain:
+                step()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_chain, step if isinstance(step, tuple) else (step,))
+                       for step in steps]
+            for future in futures:
+                future.result()
     
     def run_setup(self):
         """Run complete production setup"""
         logger.info("Starting SmartRover production setup...")
         
         self.check_root()
-        self.install_system_dependencies()
-        self.create_system_user()
-        self.create_directories()
-        self.setup_python_environment()
-        self.copy_project_files()
-        self.initialize_database()
-        self.create_config_files()
-        self.create_systemd_services()
-        self.create_management_scripts()
-        self.start_services()
+        
+        # Creating the user and directory tree doesn't need any new packages,
+        # so it runs while apt installs the build dependencies
+        self.run_parallel([
+            self.install_system_dependencies,
+            (self.create_system_user, self.create_directories)
+        ])
+        
+        # These only depend on the user and directories existing; the apt and pip
+        # downloads for tools and Python packages overlap
+        self.run_parallel([
+            self.install_system_tools,
+            self.setup_python_environment,
+            self.copy_project_files,
+            self.initialize_database,
+            self.create_config_files,
+            self.create_systemd_services,
+            self.create_management_scripts
+        ])
+        
+        self.set_permissions()
+        
+        # One flush for every file written above instead of an fsync per file;
+        # the units and configs must be on the SD card before the services start
+        logger.info("Flushing files to disk...")
+        os.sync()
+        
+        self.enable_services()
         
         # Get IP address for final message
         try:
@@ -409,6 +779,7 @@ sudo systemctl status smartrover
         print("🚀 Service Status: smartrover-status")
         print("▶️  Start Service: smartrover-start")
         print("⏹️  Stop Service: smartrover-stop")
+        print("💾 Backup Data: smartrover-backup")
         print("📊 View Logs: journalctl -u smartrover -f")
         print("="*60)
         print("The system will automatically start on boot!")
@@ -418,5 +789,3 @@ sudo systemctl status smartrover
 if __name__ == "__main__":
     setup = ProductionSetup()
     setup.run_setup()
-
-</merged_code>
@@ -4,8 +4,24 @@ import threading
 import time
 import json
 import logging
+import platform
 from vehicle_controller import VehicleController
 import os
+import psutil
+
+# orjson serializes responses in C (including NumPy values); fall back to Flask's encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Production WSGI server with a fixed thread pool; the Werkzeug dev server is the fallback
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,24 +34,50 @@ CORS(app)
 vehicle_controller = None
 vehicle_thread = None
 
+# Host metrics are sampled by a background thread at this interval; requests only read
+# the latest snapshot, which is swapped in as a whole (seconds)
+SYSTEM_INFO_INTERVAL = 1.0
+system_info_snapshot = None
+metrics_thread = None
+
+# Fixed for the life of the process
+PLATFORM_NAME = platform.platform()
+BOOT_TIME = psutil.boot_time()
+
+# Thermal sysfs file, opened once and re-read from offset 0 on each call
+THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+thermal_fd = None
+
+def json_response(data):
+    """Serialize data to a JSON response, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        try:
+            return app.response_class(
+                orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+                mimetype='application/json'
+            )
+        except orjson.JSONEncodeError:
+            pass  # Types orjson doesn't know go through Flask's encoder
+    return jsonify(data)
+
 @app.route('/api/vehicle-status', methods=['GET'])
 def get_vehicle_status():
     """Get current vehicle status"""
     try:
         if vehicle_controller:
             status_data = vehicle_controller.get_status_data()
-            return jsonify({
+            return json_response({
                 'success': True,
                 'data': status_data
             })
         else:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Vehicle controller not initialized'
             }), 500
     except Exception as e:
         logger.error(f"Error getting vehicle status: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
@@ -48,39 +90,39 @@ def control_vehicle():
         command = data.get('command')
         
         if not vehicle_controller:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Vehicle controller not initialized'
             }), 500
         
         if command == 'emergency_stop':
             vehicle_controller.emergency_stop()
-            return jsonify({
+            return json_response({
                 'success': True,
                 'message': 'Emergency stop activated'
             })
         elif command == 'start':
             if not vehicle_controller.running:
                 start_vehicle_thread()
-            return jsonify({
+            return json_response({
                 'success': True,
                 'message': 'Vehicle started'
             })
         elif command == 'stop':
             vehicle_controller.running = False
-            return jsonify({
+            return json_response({
                 'success': True,
                 'message': 'Vehicle stopped'
             })
         else:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Unknown command'
             }), 400
             
     except Exception as e:
         logger.error(f"Error controlling vehicle: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
@@ -91,18 +133,18 @@ def get_map_data():
     try:
         if vehicle_controller:
             map_data = vehicle_controller.slam_mapper.export_map_data()
-            return jsonify({
+            return json_response({
                 'success': True,
                 'data': map_data
             })
         else:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Vehicle controller not initialized'
             }), 500
     except Exception as e:
         logger.error(f"Error getting map data: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
@@ -113,7 +155,7 @@ def get_sensor_data():
     try:
         if vehicle_controller:
             readings = vehicle_controller.sensor_array.read_all_sensors()
-            return jsonify({
+            return json_response({
                 'success': True,
                 'data': {
                     'ultrasonic': readings,
@@ -122,13 +164,13 @@ def get_sensor_data():
                 }
             })
         else:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Vehicle controller not initialized'
             }), 500
     except Exception as e:
         logger.error(f"Error getting sensor data: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
@@ -137,50 +179,96 @@ def get_sensor_data():
 def get_system_info():
     """Get system information"""
     try:
-        import psutil
-        import platform
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'data': {
-                'platform': platform.platform(),
-                'cpu_percent': psutil.cpu_percent(),
-                'memory_percent': psutil.virtual_memory().percent,
-                'disk_percent': psutil.disk_usage('/').percent,
-                'temperature': get_cpu_temperature(),
-                'uptime': time.time() - psutil.boot_time(),
+                **sample_system_metrics(),
                 'vehicle_running': vehicle_controller.running if vehicle_controller else False
             }
         })
     except Exception as e:
         logger.error(f"Error getting system info: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
 
+def read_system_metrics():
+    """Sample host metrics (cpu_percent covers the time since the previous call)"""
+    return {
+        'platform': PLATFORM_NAME,
+        'cpu_percent': psutil.cpu_percent(interval=None),
+        'memory_percent': psutil.virtual_memory().percent,
+        'disk_percent': psutil.disk_usage('/').percent,
+        'temperature': get_cpu_temperature(),
+        'uptime': time.time() - BOOT_TIME
+    }
+
+def sample_system_metrics():
+    """Return the latest host metrics snapshot without touching psutil or sysfs"""
+    snapshot = system_info_snapshot
+    if snapshot is None:
+        # Sampler not started (or no sample yet)
+        snapshot = read_system_metrics()
+    return snapshot
+
+def start_metrics_thread():
+    """Sample host metrics once per SYSTEM_INFO_INTERVAL in the background"""
+    global metrics_thread
+    
+    def run_metrics():
+        global system_info_snapshot
+        psutil.cpu_percent(interval=None)  # Prime the counter; the first call always returns 0.0
+        while True:
+            time.sleep(SYSTEM_INFO_INTERVAL)
+            try:
+                system_info_snapshot = read_system_metrics()
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+    
+    metrics_thread = threading.Thread(target=run_metrics, daemon=True)
+    metrics_thread.start()
+
 def get_cpu_temperature():
     """Get CPU temperature on Raspberry Pi"""
+    global thermal_fd
     try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            temp = float(f.read()) / 1000.0
-            return temp
-    except:
+        if thermal_fd is None:
+            thermal_fd = os.open(THERMAL_ZONE_PATH, os.O_RDONLY)
+        # pread from offset 0 makes sysfs regenerate the value without reopening
+        return int(os.pread(thermal_fd, 16, 0)) / 1000.0
+    except (OSError, ValueError):
         return None
 
+def get_vehicle_controller():
+    """Create the vehicle controller once and reuse it for every start"""
+    global vehicle_controller
+    
+    if vehicle_controller is None:
+        vehicle_controller = VehicleController()
+        # Exercise the decision path once so the first real tick doesn't pay for warm-up
+        vehicle_controller.nn_model.predict_action_sensors_only([400, 400, 400, 400])
+    return vehicle_controller
+
 def start_vehicle_thread():
     """Start vehicle controller in separate thread"""
-    global vehicle_thread, vehicle_controller
+    global vehicle_thread
     
     if vehicle_thread and vehicle_thread.is_alive():
         logger.info("Vehicle thread already running")
         return
     
+    # Construct on the calling thread so the vehicle thread only runs the control loop,
+    # and a restart doesn't re-claim GPIO pins the existing controller already holds
+    try:
+        controller = get_vehicle_controller()
+    except Exception as e:
+        logger.error(f"Vehicle controller initialization error: {e}")
+        return
+    
     def run_vehicle():
-        global vehicle_controller
         try:
-            vehicle_controller = VehicleController()
-            vehicle_controller.main_loop()
+            controller.main_loop()
         except Exception as e:
             logger.error(f"Vehicle thread error: {e}")
     
@@ -191,7 +279,7 @@ def start_vehicle_thread():
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'timestamp': time.time(),
         'vehicle_running': vehicle_controller.running if vehicle_controller else False
@@ -200,7 +288,7 @@ def health_check():
 @app.route('/')
 def serve_dashboard():
     """Serve dashboard (if you want to serve static files)"""
-    return jsonify({
+    return json_response({
         'message': 'Mining Vehicle Server',
         'version': '1.0.0',
         'endpoints': [
@@ -219,5 +307,12 @@ if __name__ == '__main__':
     # Start vehicle controller thread
     start_vehicle_thread()
     
-    # Start Flask server
-    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
+    # Start host metrics sampler
+    start_metrics_thread()
+    
+    # Start HTTP server; a single process so every thread shares vehicle_controller
+    if WAITRESS_AVAILABLE:
+        serve(app, host='0.0.0.0', port=5000, threads=4, channel_timeout=30)
+    else:
+        logger.warning("waitress not installed, falling back to the Flask development server")
+        app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
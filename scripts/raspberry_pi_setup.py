@@ -10,6 +10,68 @@ from gpiozero import DistanceSensor, Motor, LED, Button
 import cv2
 import numpy as np
 
+# pigpio times echo pulses in its daemon (DMA sampling) instead of in this process
+try:
+    import pigpio
+    PIGPIO_AVAILABLE = True
+except ImportError:
+    PIGPIO_AVAILABLE = False
+
+# picamera2 hands frames from libcamera straight to NumPy; OpenCV capture is the fallback (e.g. x86 dev)
+try:
+    from picamera2 import Picamera2
+    PICAMERA2_AVAILABLE = True
+except ImportError:
+    PICAMERA2_AVAILABLE = False
+
+# Movement vector per unit speed for each action; anything else (stop, reverse) doesn't move the map position
+MOVEMENT_VECTORS = {
+    'straight': np.array([10.0, 0.0]),
+    'left': np.array([7.0, 7.0]),
+    'right': np.array([7.0, -7.0]),
+    'stop': np.array([0.0, 0.0])
+}
+
+# Ultrasonic sensors pinged together. Opposite-facing sensors point away from each other, so
+# they can share a ping; neighbours would pick up each other's echoes as false short readings
+ULTRASONIC_PING_GROUPS = [('front', 'rear'), ('left', 'right')]
+
+class PigpioUltrasonicSensor:
+    """HC-SR04 sensor whose echo edges are timestamped by the pigpio daemon"""
+    
+    def __init__(self, pi, trigger, echo):
+        self.pi = pi
+        self.trigger = trigger
+        self.echo = echo
+        self.rise_tick = None
+        self.pulse_us = None  # Width of the last complete echo pulse
+        
+        pi.set_mode(trigger, pigpio.OUTPUT)
+        pi.write(trigger, 0)
+        pi.set_mode(echo, pigpio.INPUT)
+        self.callback = pi.callback(echo, pigpio.EITHER_EDGE, self._echo_edge)
+    
+    def _echo_edge(self, gpio, level, tick):
+        if level == 1:
+            self.rise_tick = tick
+        elif level == 0 and self.rise_tick is not None:
+            self.pulse_us = pigpio.tickDiff(self.rise_tick, tick)
+            self.rise_tick = None
+    
+    def ping(self):
+        """Send a 10us trigger pulse; the echo is captured asynchronously"""
+        self.pulse_us = None
+        self.pi.gpio_trigger(self.trigger, 10, 1)
+    
+    def distance_cm(self):
+        """Distance from the last ping, or max range if no echo came back"""
+        if self.pulse_us is None:
+            return 400
+        return min(self.pulse_us / 58.0, 400)  # ~58us of round trip per cm
+    
+    def close(self):
+        self.callback.cancel()
+
 class RaspberryPiHardware:
     def __init__(self):
         # GPIO pin assignments
@@ -46,11 +108,26 @@ class RaspberryPiHardware:
         self.right_motor = Motor(forward=self.MOTOR_RIGHT_FORWARD, 
                                 backward=self.MOTOR_RIGHT_BACKWARD)
         
-        # Setup ultrasonic sensors
+        # Setup ultrasonic sensors, through the pigpio daemon when it's running
+        self.pi = pigpio.pi() if PIGPIO_AVAILABLE else None
+        if self.pi is not None and not self.pi.connected:
+            self.pi = None
+        
         self.sensors = {}
         for direction, pins in self.ULTRASONIC_PINS.items():
-            self.sensors[direction] = DistanceSensor(echo=pins['echo'], 
-                                                   trigger=pins['trigger'])
+            if self.pi is not None:
+                self.sensors[direction] = PigpioUltrasonicSensor(self.pi, pins['trigger'], pins['echo'])
+            else:
+                self.sensors[direction] = DistanceSensor(echo=pins['echo'], 
+                                                       trigger=pins['trigger'])
+        
+        # Latest distances (cm) in front/left/right/rear order, kept fresh by a
+        # background thread so the control loop never waits on an echo
+        self.sensor_order = ['front', 'left', 'right', 'rear']
+        self.distances = np.full(len(self.sensor_order), 400, dtype=np.float32)
+        self.sensor_running = True
+        self.sensor_thread = threading.Thread(target=self._sensor_loop, daemon=True)
+        self.sensor_thread.start()
         
         # Setup LEDs
         self.status_led = LED(self.STATUS_LED)
@@ -61,25 +138,72 @@ class RaspberryPiHardware:
         self.emergency_button.when_pressed = self.emergency_stop
         
         # Initialize camera
-        self.camera = cv2.VideoCapture(0)
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        self.picam = None
+        self.camera = None
+        if PICAMERA2_AVAILABLE:
+            try:
+                # RGB888 is BGR in memory, the same channel order OpenCV frames use
+                self.picam = Picamera2()
+                self.picam.configure(self.picam.create_preview_configuration(
+                    main={"size": (640, 480), "format": "RGB888"}))
+                self.picam.start()
+            except Exception as e:
+                print(f"picamera2 unavailable, falling back to OpenCV capture: {e}")
+                self.picam = None
+        
+        if self.picam is None:
+            # A one-frame driver queue keeps grabs from going stale
+            self.camera = cv2.VideoCapture(0, cv2.CAP_V4L2)
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        # Double buffer: the grab thread fills one slot while the control loop reads the other
+        self.frame_slots = [None, None]
+        self.frame_index = 0
+        self.frame_ready = threading.Event()
+        self.camera_running = True
+        self.camera_thread = threading.Thread(target=self._camera_loop, daemon=True)
+        self.camera_thread.start()
         
         print("Hardware initialized successfully")
     
-    def read_ultrasonic_sensors(self):
-        """Read all ultrasonic sensors"""
-        readings = {}
-        for direction, sensor in self.sensors.items():
-            try:
-                distance = sensor.distance * 100  # Convert to cm
-                readings[direction] = min(distance, 400)  # Cap at 400cm
-            except Exception as e:
-                print(f"Error reading {direction} sensor: {e}")
-                readings[direction] = 400  # Default to max range
+    def _sensor_loop(self):
+        """Continuously sample all ultrasonic sensors into self.distances"""
+        if self.pi is not None:
+            self._pigpio_sensor_loop()
+            return
         
-        return [readings['front'], readings['left'], 
-                readings['right'], readings['rear']]
+        while self.sensor_running:
+            for index, direction in enumerate(self.sensor_order):
+                try:
+                    distance = self.sensors[direction].distance * 100  # Convert to cm
+                    self.distances[index] = min(distance, 400)  # Cap at 400cm
+                except Exception as e:
+                    print(f"Error reading {direction} sensor: {e}")
+                    self.distances[index] = 400  # Default to max range
+            
+            time.sleep(0.02)
+    
+    def _pigpio_sensor_loop(self):
+        """Ping the sensors one opposite-facing pair at a time and collect the echoes after the max round trip"""
+        groups = [
+            [(self.sensor_order.index(direction), self.sensors[direction]) for direction in group]
+            for group in ULTRASONIC_PING_GROUPS
+        ]
+        while self.sensor_running:
+            for group in groups:
+                for _, sensor in group:
+                    sensor.ping()
+                
+                time.sleep(0.03)  # 400cm echo takes ~23ms
+                
+                for index, sensor in group:
+                    self.distances[index] = sensor.distance_cm()
+    
+    def read_ultrasonic_sensors(self):
+        """Return the latest front, left, right and rear distances without blocking"""
+        return self.distances.tolist()
     
     def control_motors(self, action, speed):
         """Control vehicle movement based on action and speed"""
@@ -99,12 +223,27 @@ class RaspberryPiHardware:
             self.left_motor.backward(speed)
             self.right_motor.backward(speed)
     
+    def _camera_loop(self):
+        """Grab frames continuously into the back slot, then flip it to the front"""
+        while self.camera_running:
+            if self.picam is not None:
+                frame = self.picam.capture_array("main")
+                ret = frame is not None
+            else:
+                ret, frame = self.camera.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            
+            back = self.frame_index ^ 1
+            self.frame_slots[back] = frame
+            self.frame_index = back
+            self.frame_ready.set()
+    
     def capture_frame(self):
-        """Capture frame from camera"""
-        ret, frame = self.camera.read()
-        if ret:
-            return frame
-        return None
+        """Return the most recent camera frame (None until the first one arrives)"""
+        self.frame_ready.wait(timeout=1.0)
+        return self.frame_slots[self.frame_index]
     
     def update_status_leds(self, obstacle_detected):
         """Update status LEDs based on system state"""
@@ -125,9 +264,21 @@ class RaspberryPiHardware:
     
     def cleanup(self):
         """Cleanup GPIO and camera resources"""
+        self.sensor_running = False
+        self.sensor_thread.join(timeout=1.0)
+        self.camera_running = False
+        self.camera_thread.join(timeout=1.0)
         self.left_motor.stop()
         self.right_motor.stop()
-        self.camera.release()
+        if self.picam is not None:
+            self.picam.stop()
+            self.picam.close()
+        else:
+            self.camera.release()
+        if self.pi is not None:
+            for sensor in self.sensors.values():
+                sensor.close()
+            self.pi.stop()
         GPIO.cleanup()
         print("Hardware cleanup completed")
 
@@ -144,6 +295,10 @@ class RaspberryPiVehicleController:
         """Main execution loop for Raspberry Pi"""
         self.running = True
         
+        # Sleep until fixed deadlines so the loop body's own duration doesn't stretch the period
+        period = 0.1  # 10 FPS
+        next_tick = time.monotonic() + period
+        
         try:
             while self.running:
                 # Capture camera frame
@@ -189,7 +344,14 @@ class RaspberryPiVehicleController:
                 
                 self.controller.send_data_to_server(server_data)
                 
-                time.sleep(0.1)  # 10 FPS
+                remaining = next_tick - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+                    next_tick += period
+                else:
+                    # Overran the slot; restart the schedule instead of bursting to catch up
+                    print(f"Control loop overrun by {-remaining:.3f}s")
+                    next_tick = time.monotonic() + period
                 
         except KeyboardInterrupt:
             print("Stopping vehicle...")
@@ -198,17 +360,7 @@ class RaspberryPiVehicleController:
     
     def calculate_movement(self, action_data):
         """Calculate movement vector based on action"""
-        speed = action_data['speed']
-        action = action_data['action']
-        
-        if action == 'straight':
-            return [speed * 10, 0]
-        elif action == 'left':
-            return [speed * 7, speed * 7]
-        elif action == 'right':
-            return [speed * 7, -speed * 7]
-        else:
-            return [0, 0]
+        return MOVEMENT_VECTORS.get(action_data['action'], MOVEMENT_VECTORS['stop']) * action_data['speed']
     
     def cleanup(self):
         """Cleanup all resources"""
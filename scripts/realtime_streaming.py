@@ -5,21 +5,46 @@ Handles WebSocket-based real-time sensor data streaming and live updates
 """
 
 import asyncio
+import heapq
+import os
 import websockets
 import json
 import time
 import threading
 import logging
-import queue
 import numpy as np
 from datetime import datetime
 import sqlite3
 import cv2
-import base64
+import struct
+import sys
 from collections import deque
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from fractions import Fraction
 import psutil
 import platform
 
+# PyAV exposes FFmpeg's hardware H.264 encoders; without it video falls back to per-frame JPEG
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+# orjson serializes in C (including NumPy values); fall back to the json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# libuv-based event loop; the default asyncio loop is used when it isn't installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +56,394 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Resolution of the streamed video (width, height)
+VIDEO_SIZE = (320, 240)
+
+# Hardware H.264 encoders tried in order: NVENC on NVIDIA GPUs, V4L2 M2M on the Pi's VideoCore.
+# Options select the lowest-latency preset so each packet can be decoded as soon as it arrives
+H264_ENCODERS = (
+    ('h264_nvenc', {'preset': 'p1', 'tune': 'll', 'zerolatency': '1'}),
+    ('h264_v4l2m2m', {}),
+)
+
+# Video goes out as binary WebSocket messages: a header (frame type, timestamp, payload length)
+# followed by the JPEG image or H.264 NAL units
+VIDEO_HEADER_FORMAT = '!BdI'
+VIDEO_FRAME_JPEG = 1
+VIDEO_FRAME_H264 = 2
+
+# Binary history replies share the frame-type byte: a header (frame type, sample count) followed by
+# each field's raw array bytes, in the layout announced by the preceding JSON reply
+HISTORY_HEADER_FORMAT = '!BI'
+HISTORY_FRAME = 3
+
+# A client with more than this many bytes still unsent in its socket is skipped for video until it
+# drains, so a slow link only loses frames instead of backing up the broadcast (bytes)
+SEND_HIGH_WATER_MARK = 256 * 1024
+
+# A send still blocked after this long is abandoned for the tick instead of holding up the next
+# broadcast (seconds)
+SEND_TIMEOUT = 1.0
+
+# Thermal sysfs file, opened once and re-read from offset 0 on each call
+THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+# Sensor (10 Hz) and system (1 Hz) ticks share a temperature reading for this long (seconds)
+TEMPERATURE_CACHE_TTL = 0.5
+
+# /proc files behind the system stream, kept open and re-read from offset 0 each tick
+PROC_STAT_PATH = '/proc/stat'
+PROC_MEMINFO_PATH = '/proc/meminfo'
+PROC_NET_DEV_PATH = '/proc/net/dev'
+
+# Disk usage changes slowly, so it is re-read at most this often (seconds)
+DISK_USAGE_CACHE_TTL = 10.0
+
+# Fields kept in each stream's history: name -> (dtype, per-sample shape[, scale]).
+# Low-precision readings are stored as int16 multiples of 1/scale (ultrasonic in mm, heading in
+# milliradians, battery in 10 mV, temperature in 0.1 °C); binary history clients divide by the
+# reported scale. Nested fields ('O') are kept as Python objects and left out of binary history
+SENSOR_HISTORY_COLUMNS = {
+    'ultrasonic': ('i2', (4,), 10),
+    'position': ('f4', (2,)),
+    'heading': ('i2', (), 1000),
+    'speed': ('f4', ()),
+    'battery_voltage': ('i2', (), 100),
+    'temperature': ('i2', (), 10),
+    'camera_available': ('?', ()),
+    'obstacle_detected': ('?', ())
+}
+SYSTEM_HISTORY_COLUMNS = {
+    'cpu_percent': ('f4', ()),
+    'memory_percent': ('f4', ()),
+    'disk_percent': ('f4', ()),
+    'temperature': ('f4', ()),
+    'uptime': ('f8', ()),
+    'network_stats': ('O', ()),
+    'vehicle_status': ('O', ()),
+    'connectivity': ('O', ())
+}
+GPS_HISTORY_COLUMNS = {
+    'latitude': ('f8', ()),
+    'longitude': ('f8', ()),
+    'altitude': ('f4', ()),
+    'speed': ('f4', ()),
+    'heading': ('f4', ()),
+    'satellites': ('i2', ()),
+    'fix_quality': ('i1', ()),
+    'hdop': ('f4', ()),
+    'fix_available': ('?', ()),
+    'utm_coordinates': ('O', ()),
+    'local_coordinates': ('O', ())
+}
+
+# Stored in scaled int16 columns for a missing (None) reading
+INT16_MISSING = -32768
+
+def json_default(obj):
+    """json.dumps default hook for stream records and NumPy values (orjson handles both natively)"""
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        # NaN marks a missing reading; emit null like orjson does
+        return np.where(np.isnan(obj), None, obj.astype(object)).tolist()
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def nan_to_none(value):
+    """Replace NaN (a missing reading in a float history column) with None, inside lists too"""
+    if isinstance(value, list):
+        return [nan_to_none(item) for item in value]
+    return None if value != value else value
+
+def dumps(data):
+    """Serialize data to JSON text, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        # Decoded so JSON still goes out as text frames; binary frames carry video
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(data, default=json_default)
+
+def loads(message):
+    """Parse a JSON client message (orjson.JSONDecodeError subclasses json.JSONDecodeError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(message)
+    return json.loads(message)
+
+class H264Encoder:
+    """Persistent hardware H.264 encoder producing an Annex-B byte stream"""
+    
+    def __init__(self, width, height, fps):
+        self.context = None
+        self.codec_name = None
+        self.pts = 0
+        self.keyframe = False
+        
+        for codec_name, options in H264_ENCODERS:
+            try:
+                context = av.CodecContext.create(codec_name, 'w')
+                context.width = width
+                context.height = height
+                context.pix_fmt = 'yuv420p'
+                context.time_base = Fraction(1, fps)
+                context.framerate = Fraction(fps, 1)
+                context.gop_size = fps * 2  # Keyframe every 2 s so newly subscribed clients can start decoding
+                context.max_b_frames = 0
+                context.bit_rate = 500000
+                context.options = options
+                context.open()
+                self.context = context
+                self.codec_name = codec_name
+                break
+            except Exception as e:
+                logger.info(f"📡 H.264 encoder {codec_name} unavailable: {e}")
+        
+        if self.context is None:
+            raise RuntimeError("No hardware H.264 encoder available")
+    
+    def encode(self, frame):
+        """Encode a BGR frame and return the NAL units it produced (may be empty); keyframe
+        tells whether they start a new GOP"""
+        video_frame = av.VideoFrame.from_ndarray(frame, format='bgr24').reformat(format='yuv420p')
+        video_frame.pts = self.pts
+        self.pts += 1
+        packets = self.context.encode(video_frame)
+        self.keyframe = any(packet.is_keyframe for packet in packets)
+        return b''.join(bytes(packet) for packet in packets)
+
+# Stream records. Slotted dataclasses store their fields in a fixed array instead of a
+# per-instance dict, and serialize to the same JSON objects the dicts did. slots= needs
+# Python 3.10; older interpreters (Raspberry Pi OS Bullseye ships 3.9) get plain dataclasses
+RECORD_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**RECORD_OPTIONS)
+class StreamMessage:
+    timestamp: float
+    type: str
+    data: object
+
+@dataclass(**RECORD_OPTIONS)
+class UnchangedData:
+    """Sent in place of data identical to the stream's previous record"""
+    unchanged: bool
+    n: int  # Consecutive repeats so far
+
+@dataclass(**RECORD_OPTIONS)
+class SensorData:
+    ultrasonic: list
+    camera_available: bool
+    position: list
+    heading: float
+    speed: float
+    battery_voltage: float
+    temperature: float
+    obstacle_detected: bool = False  # Will be updated by AI
+
+@dataclass(**RECORD_OPTIONS)
+class VideoData:
+    codec: str
+    fps: int
+    available: bool
+    frame: bytes = None
+    resolution: list = None
+    keyframe: bool = True
+
+@dataclass(**RECORD_OPTIONS)
+class SystemData:
+    cpu_percent: float
+    memory_percent: float
+    disk_percent: float
+    temperature: float
+    uptime: float
+    network_stats: dict
+    vehicle_status: dict
+    connectivity: dict
+
+@dataclass(**RECORD_OPTIONS)
+class GpsData:
+    latitude: float = None
+    longitude: float = None
+    altitude: float = None
+    speed: float = None
+    heading: float = None
+    satellites: int = 0
+    fix_quality: int = 0
+    hdop: float = 99.9
+    fix_available: bool = False
+    utm_coordinates: list = None
+    local_coordinates: list = None
+
+@dataclass(**RECORD_OPTIONS)
+class MiningData:
+    active: bool
+    current_waypoint: object
+    waypoints_completed: int
+    minerals_collected: int
+    total_distance: float
+    session_id: object
+    returning_to_dock: bool
+    path_data: dict
+
+class HistoryRing:
+    """Fixed-size stream history kept as one NumPy array per field (struct of arrays)"""
+    
+    def __init__(self, stream_type, capacity, columns):
+        self.stream_type = stream_type
+        self.capacity = capacity
+        self.count = 0  # Samples appended so far; the next one goes to row count % capacity
+        self.latest = None
+        self.timestamps = np.zeros(capacity, dtype='f8')
+        self.columns = {
+            name: np.full((capacity,) + spec[1], None, dtype=object) if spec[0] == 'O'
+            else np.zeros((capacity,) + spec[1], dtype=spec[0])
+            for name, spec in columns.items()
+        }
+        self.scales = {name: spec[2] for name, spec in columns.items() if len(spec) > 2}
+        # Missing (None) readings are stored as NaN in float columns, INT16_MISSING in scaled ones,
+        # None in object ones and 0 elsewhere
+        self.missing = {
+            name: np.nan if column.dtype.kind == 'f' else INT16_MISSING if name in self.scales
+            else None if column.dtype.kind == 'O' else 0
+            for name, column in self.columns.items()
+        }
+        # Binary layout, fixed by the schema: field name, NumPy dtype string, per-sample shape
+        self.packed = [name for name, column in self.columns.items() if column.dtype.kind != 'O']
+        self.layout = [('timestamp', self.timestamps.dtype.str, [])] + [
+            (name, self.columns[name].dtype.str, list(self.columns[name].shape[1:])) for name in self.packed
+        ]
+    
+    def __len__(self):
+        return min(self.count, self.capacity)
+    
+    def append(self, record):
+        """Store a StreamMessage's timestamp and data fields in the next row"""
+        row = self.count % self.capacity
+        self.timestamps[row] = record.timestamp
+        for name, column in self.columns.items():
+            value = getattr(record.data, name)
+            if value is None:
+                column[row] = self.missing[name]
+            elif name in self.scales:
+                column[row] = np.clip(np.rint(np.multiply(value, self.scales[name])), -32767, 32767)
+            else:
+                column[row] = value
+        self.latest = record
+        self.count += 1
+    
+    def rows(self, limit):
+        """Index the newest `limit` samples, oldest first; returns (sample count, index).
+        The index is a plain slice unless the range wraps past the end of the ring"""
+        limit = max(0, min(limit, len(self)))
+        start = (self.count - limit) % self.capacity
+        end = start + limit
+        if end <= self.capacity:
+            return limit, slice(start, end)
+        return limit, np.r_[start:self.capacity, 0:end - self.capacity]
+    
+    def tail(self, limit):
+        """Return the newest `limit` samples as one array per field, oldest first, plus the
+        scale factors of any int16 fields. Unless the range wraps these are views into the
+        ring, valid until the next append overwrites them"""
+        limit, rows = self.rows(limit)
+        data = {'timestamp': self.timestamps[rows]}
+        for name, column in self.columns.items():
+            data[name] = column[rows]
+        if self.scales:
+            data['scale'] = self.scales
+        return data
+    
+    def pack(self, limit):
+        """Pack the newest `limit` samples as a binary history frame; returns (sample count, bytes)"""
+        limit, rows = self.rows(limit)
+        parts = [struct.pack(HISTORY_HEADER_FORMAT, HISTORY_FRAME, limit), self.timestamps[rows].tobytes()]
+        for name in self.packed:
+            parts.append(self.columns[name][rows].tobytes())
+        return limit, b''.join(parts)
+    
+    def records(self, data):
+        """Turn columns from tail() (optionally filtered) back into the stream's record dicts,
+        oldest first: scaled fields in their own units and missing readings as None"""
+        names = []
+        values = []
+        for name, column in data.items():
+            if name in ('timestamp', 'scale'):
+                continue
+            if name in self.scales:
+                missing = column == INT16_MISSING
+                column = column / self.scales[name]
+                column[missing] = np.nan
+            if column.dtype.kind == 'f':
+                column = [nan_to_none(value) for value in column.tolist()]
+            else:
+                column = column.tolist()
+            names.append(name)
+            values.append(column)
+        return [
+            {'timestamp': timestamp, 'type': self.stream_type, 'data': dict(zip(names, row))}
+            for timestamp, row in zip(data['timestamp'].tolist(), zip(*values))
+        ]
+
+class ProcMetrics:
+    """Host metrics parsed straight from /proc through persistent file descriptors"""
+    
+    def __init__(self):
+        self.stat_fd = os.open(PROC_STAT_PATH, os.O_RDONLY)
+        self.meminfo_fd = os.open(PROC_MEMINFO_PATH, os.O_RDONLY)
+        self.net_dev_fd = os.open(PROC_NET_DEV_PATH, os.O_RDONLY)
+        
+        self.cpu_times = self.read_cpu_times()
+        self.disk_percent = None
+        self.disk_time = float('-inf')
+    
+    def read_cpu_times(self):
+        """Return (idle, total) jiffies from the aggregate cpu line of /proc/stat"""
+        fields = os.pread(self.stat_fd, 4096, 0).split(b'\n', 1)[0].split()
+        # user nice system idle iowait irq softirq steal; guest time is already counted in user/nice
+        times = [int(field) for field in fields[1:9]]
+        return times[3] + times[4], sum(times)
+    
+    def get_cpu_percent(self):
+        """CPU utilisation since the previous call"""
+        idle, total = self.read_cpu_times()
+        previous_idle, previous_total = self.cpu_times
+        self.cpu_times = (idle, total)
+        
+        elapsed = total - previous_total
+        if elapsed <= 0:
+            return 0.0
+        return round(100.0 * (1.0 - (idle - previous_idle) / elapsed), 1)
+    
+    def get_memory_percent(self):
+        """Memory in use, computed like psutil.virtual_memory().percent"""
+        fields = {}
+        # The first lines are MemTotal, MemFree and MemAvailable
+        for line in os.pread(self.meminfo_fd, 4096, 0).split(b'\n', 3)[:3]:
+            name, value = line.split(b':', 1)
+            fields[name] = int(value.split()[0])
+        
+        total = fields[b'MemTotal']
+        return round(100.0 * (total - fields[b'MemAvailable']) / total, 1)
+    
+    def get_disk_percent(self):
+        """Root filesystem usage, cached for DISK_USAGE_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if now - self.disk_time >= DISK_USAGE_CACHE_TTL:
+            self.disk_percent = psutil.disk_usage('/').percent
+            self.disk_time = now
+        return self.disk_percent
+    
+    def get_network_stats(self):
+        """Totals across all interfaces, like psutil.net_io_counters()"""
+        stats = {'bytes_sent': 0, 'bytes_recv': 0, 'packets_sent': 0, 'packets_recv': 0}
+        # Two header lines, then '<iface>: <8 receive counters> <8 transmit counters>'
+        for line in os.pread(self.net_dev_fd, 65536, 0).splitlines()[2:]:
+            fields = line.split(b':', 1)[1].split()
+            stats['bytes_recv'] += int(fields[0])
+            stats['packets_recv'] += int(fields[1])
+            stats['bytes_sent'] += int(fields[8])
+            stats['packets_sent'] += int(fields[9])
+        return stats
+
 class DataStreamManager:
     def __init__(self, vehicle_controller=None, database_path='/var/lib/smartrover/mining_data.db'):
         self.vehicle_controller = vehicle_controller
@@ -38,14 +451,24 @@ class DataStreamManager:
         
         # WebSocket connections
         self.websocket_clients = set()
-        self.client_subscriptions = {}  # client -> set of data types
+        self.client_subscriptions = {}  # client -> frozenset of data types
         
-        # Data queues for different stream types
-        self.sensor_queue = queue.Queue(maxsize=100)
-        self.video_queue = queue.Queue(maxsize=10)
-        self.system_queue = queue.Queue(maxsize=50)
-        self.gps_queue = queue.Queue(maxsize=100)
-        self.mining_queue = queue.Queue(maxsize=50)
+        # Clients grouped by identical subscriptions, so each group's message is serialized once;
+        # rebuilt by the broadcaster whenever a client connects, disconnects or changes subscriptions
+        self.subscription_groups = {}
+        self.subscriptions_changed = False
+        
+        # Video subscribers that can't decode the next H.264 frame (newly subscribed, or a frame was
+        # skipped for them); they get nothing until a keyframe
+        self.video_resync = set()
+        
+        # Data queues for different stream types; each has one producer (the producer task, or the
+        # video thread) and one consumer (the broadcaster), and deque append/popleft are atomic
+        self.sensor_queue = deque(maxlen=100)
+        self.video_queue = deque(maxlen=10)
+        self.system_queue = deque(maxlen=50)
+        self.gps_queue = deque(maxlen=100)
+        self.mining_queue = deque(maxlen=50)
         
         # Stream configuration
         self.stream_rates = {
@@ -56,19 +479,45 @@ class DataStreamManager:
             'mining': 2     # 2 Hz
         }
         
+        # Last data queued per stream, so repeats go out as UnchangedData markers
+        self.last_stream_data = {}
+        self.repeat_counts = {}
+        
         # Data buffers for historical data
-        self.sensor_buffer = deque(maxlen=1000)
-        self.system_buffer = deque(maxlen=300)
-        self.gps_buffer = deque(maxlen=600)
+        self.sensor_buffer = HistoryRing('sensors', 1000, SENSOR_HISTORY_COLUMNS)
+        self.system_buffer = HistoryRing('system', 300, SYSTEM_HISTORY_COLUMNS)
+        self.gps_buffer = HistoryRing('gps', 600, GPS_HISTORY_COLUMNS)
+        
+        # CPU temperature cache
+        try:
+            self.thermal_fd = os.open(THERMAL_ZONE_PATH, os.O_RDONLY)
+        except OSError:
+            self.thermal_fd = None
+        self.temperature = None
+        self.temperature_time = float('-inf')
+        
+        # Host metrics for the system stream; psutil is the fallback where /proc isn't available
+        try:
+            self.proc_metrics = ProcMetrics()
+        except OSError:
+            self.proc_metrics = None
+        self.boot_time = psutil.boot_time()
         
         # Threading
         self.running = False
         self.data_threads = {}
         
+        # Producers wake the broadcaster through this event on the server's event loop
+        # (the video thread via notify_broadcaster)
+        self.loop = None
+        self.data_ready = None
+        
         # Statistics
         self.stream_stats = {
             'total_messages_sent': 0,
             'total_bytes_sent': 0,
+            'video_frames_skipped': 0,
+            'send_timeouts': 0,
             'connected_clients': 0,
             'start_time': time.time()
         }
@@ -76,27 +525,21 @@ class DataStreamManager:
         logger.info("📡 Data stream manager initialized")
     
     def start_streaming(self):
-        """Start all data streaming threads"""
+        """Start the video capture thread; the other streams are collected by produce_data"""
         logger.info("📡 Starting real-time data streaming...")
         
         self.running = True
         
-        # Start data collection threads
-        self.data_threads['sensors'] = threading.Thread(
-            target=self.sensor_data_thread, daemon=True, name="SensorStream"
-        )
+        # Bind the controller's components once so collectors read their attributes directly
+        vc = self.vehicle_controller
+        self.read_ultrasonic = vc.sensor_array.read_all_sensors if vc else None
+        self.slam_mapper = vc.slam_mapper if vc else None
+        self.waypoint_navigator = vc.waypoint_navigator if vc else None
+        
+        # Camera reads block, so video keeps its own thread
         self.data_threads['video'] = threading.Thread(
             target=self.video_data_thread, daemon=True, name="VideoStream"
         )
-        self.data_threads['system'] = threading.Thread(
-            target=self.system_data_thread, daemon=True, name="SystemStream"
-        )
-        self.data_threads['gps'] = threading.Thread(
-            target=self.gps_data_thread, daemon=True, name="GPSStream"
-        )
-        self.data_threads['mining'] = threading.Thread(
-            target=self.mining_data_thread, daemon=True, name="MiningStream"
-        )
         
         # Start all threads
         for thread in self.data_threads.values():
@@ -117,105 +560,120 @@ class DataStreamManager:
         
         logger.info("📡 Data streaming stopped")
     
-    def sensor_data_thread(self):
-        """Thread for collecting sensor data"""
-        logger.info("📡 Sensor data thread started")
+    def read_sensor_data(self):
+        """Read one sensor sample, or None without a vehicle controller (blocking: runs in the executor)"""
+        vc = self.vehicle_controller
+        if not vc:
+            return None
         
-        while self.running:
-            try:
-                if self.vehicle_controller:
-                    # Get sensor data from vehicle controller
-                    sensor_data = {
-                        'timestamp': time.time(),
-                        'type': 'sensors',
-                        'data': {
-                            'ultrasonic': getattr(self.vehicle_controller.sensor_array, 'read_all_sensors', lambda: [0, 0, 0, 0])(),
-                            'camera_available': getattr(self.vehicle_controller, 'camera_available', False),
-                            'position': getattr(self.vehicle_controller.slam_mapper, 'robot_position', [0, 0]),
-                            'heading': getattr(self.vehicle_controller.slam_mapper, 'robot_heading', 0),
-                            'speed': getattr(self.vehicle_controller, 'current_speed', 0),
-                            'battery_voltage': self.get_battery_voltage(),
-                            'temperature': self.get_system_temperature(),
-                            'obstacle_detected': False  # Will be updated by AI
-                        }
-                    }
-                    
-                    # Add to buffer
-                    self.sensor_buffer.append(sensor_data)
-                    
-                    # Add to queue for streaming
-                    try:
-                        self.sensor_queue.put_nowait(sensor_data)
-                    except queue.Full:
-                        # Remove oldest item and add new one
-                        try:
-                            self.sensor_queue.get_nowait()
-                            self.sensor_queue.put_nowait(sensor_data)
-                        except queue.Empty:
-                            pass
-                
-                time.sleep(1.0 / self.stream_rates['sensors'])
-                
-            except Exception as e:
-                logger.error(f"Error in sensor data thread: {e}")
-                time.sleep(1)
+        # Get sensor data from vehicle controller
+        return StreamMessage(time.time(), 'sensors', SensorData(
+            ultrasonic=self.read_ultrasonic(),
+            camera_available=vc.camera_available,
+            position=self.slam_mapper.robot_position,
+            heading=self.slam_mapper.robot_heading,
+            speed=getattr(vc, 'current_speed', 0),  # VehicleController doesn't track speed itself
+            battery_voltage=self.get_battery_voltage(),
+            temperature=self.get_cpu_temperature()
+        ))
+    
+    def store_sensor_data(self, sensor_data):
+        """Keep and queue a sensor sample read by read_sensor_data"""
+        if sensor_data is None:
+            return False
+        
+        # Add to buffer
+        self.sensor_buffer.append(sensor_data)
         
-        logger.info("📡 Sensor data thread stopped")
+        # Add to queue for streaming; a full deque drops its oldest item
+        self.sensor_queue.append(sensor_data)
+        return True
     
     def video_data_thread(self):
         """Thread for collecting video data"""
         logger.info("📡 Video data thread started")
         
         camera = None
+        mjpeg_fourcc = cv2.VideoWriter_fourcc(*'MJPG')
         try:
             # Try to initialize camera
-            camera = cv2.VideoCapture(0)
+            camera = cv2.VideoCapture(0, cv2.CAP_V4L2)
             if not camera.isOpened():
                 logger.warning("📡 Camera not available for video streaming")
                 camera = None
+            else:
+                # Ask for MJPEG at the stream size and rate so the camera scales and compresses
+                camera.set(cv2.CAP_PROP_FOURCC, mjpeg_fourcc)
+                camera.set(cv2.CAP_PROP_FRAME_WIDTH, VIDEO_SIZE[0])
+                camera.set(cv2.CAP_PROP_FRAME_HEIGHT, VIDEO_SIZE[1])
+                camera.set(cv2.CAP_PROP_FPS, self.stream_rates['video'])
+                camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         except Exception as e:
             logger.warning(f"📡 Camera initialization failed: {e}")
             camera = None
         
+        # Prefer a hardware H.264 stream; inter-frame prediction needs far fewer bytes than per-frame JPEG
+        encoder = None
+        if camera is not None and AV_AVAILABLE:
+            try:
+                encoder = H264Encoder(*VIDEO_SIZE, self.stream_rates['video'])
+                logger.info(f"📡 Streaming H.264 video with {encoder.codec_name}")
+            except Exception as e:
+                logger.warning(f"📡 {e}, streaming JPEG frames instead")
+        
+        # Without an H.264 encoder, forward the camera's own JPEGs instead of decoding and re-encoding
+        mjpeg_passthrough = False
+        if camera is not None and encoder is None and int(camera.get(cv2.CAP_PROP_FOURCC)) == mjpeg_fourcc:
+            mjpeg_passthrough = camera.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+            if mjpeg_passthrough:
+                # The driver may have picked the nearest size it supports
+                camera_size = [int(camera.get(cv2.CAP_PROP_FRAME_WIDTH)), int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT))]
+                logger.info("📡 Streaming the camera's MJPEG frames directly")
+        
+        # When frames have to be JPEG-encoded here, resize through OpenCL (T-API) if a device is available
+        use_opencl = camera is not None and encoder is None and not mjpeg_passthrough and cv2.ocl.haveOpenCL()
+        if use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+            logger.info("📡 Using OpenCL for video frame resizing")
+        
+        period = 1.0 / self.stream_rates['video']
+        next_frame = time.monotonic()
+        
         while self.running:
             try:
-                video_data = {
-                    'timestamp': time.time(),
-                    'type': 'video',
-                    'data': {
-                        'frame': None,
-                        'resolution': None,
-                        'fps': self.stream_rates['video'],
-                        'available': camera is not None
-                    }
-                }
+                video_data = StreamMessage(time.time(), 'video', VideoData(
+                    codec='h264' if encoder else 'jpeg',
+                    fps=self.stream_rates['video'],
+                    available=camera is not None
+                ))
                 
-                if camera and camera.isOpened():
-                    ret, frame = camera.read()
-                    if ret:
-                        # Resize frame for streaming
-                        frame = cv2.resize(frame, (320, 240))
+                if camera and camera.isOpened() and camera.grab():
+                    ret, frame = camera.retrieve()
+                    if ret and mjpeg_passthrough:
+                        video_data.data.frame = frame.tobytes()
+                        video_data.data.resolution = camera_size
+                    elif ret:
+                        # Resize frame for streaming if the camera didn't deliver the stream size
+                        if (frame.shape[1], frame.shape[0]) != VIDEO_SIZE:
+                            frame = cv2.resize(cv2.UMat(frame) if use_opencl else frame, VIDEO_SIZE)
                         
-                        # Encode frame as JPEG
-                        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+                        if encoder:
+                            video_data.data.frame = encoder.encode(frame)
+                            video_data.data.keyframe = encoder.keyframe
+                        else:
+                            # Encode frame as JPEG
+                            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+                            video_data.data.frame = buffer.tobytes()
                         
-                        # Convert to base64
-                        frame_b64 = base64.b64encode(buffer).decode('utf-8')
-                        
-                        video_data['data']['frame'] = frame_b64
-                        video_data['data']['resolution'] = [320, 240]
+                        video_data.data.resolution = list(VIDEO_SIZE)
                 
-                # Add to queue
-                try:
-                    self.video_queue.put_nowait(video_data)
-                except queue.Full:
-                    try:
-                        self.video_queue.get_nowait()
-                        self.video_queue.put_nowait(video_data)
-                    except queue.Empty:
-                        pass
+                # Add to queue; a full deque drops its oldest item
+                self.video_queue.append(video_data)
+                self.notify_broadcaster()
                 
-                time.sleep(1.0 / self.stream_rates['video'])
+                # Pace on the monotonic clock so capture time doesn't add to the period
+                next_frame = max(next_frame + period, time.monotonic())
+                time.sleep(max(0.0, next_frame - time.monotonic()))
                 
             except Exception as e:
                 logger.error(f"Error in video data thread: {e}")
@@ -226,140 +684,159 @@ class DataStreamManager:
         
         logger.info("📡 Video data thread stopped")
     
-    def system_data_thread(self):
-        """Thread for collecting system data"""
-        logger.info("📡 System data thread started")
+    def read_system_data(self):
+        """Read one system sample (blocking: runs in the executor)"""
+        vc = self.vehicle_controller
+        now = time.time()
+        return StreamMessage(now, 'system', SystemData(
+            cpu_percent=self.proc_metrics.get_cpu_percent() if self.proc_metrics else psutil.cpu_percent(),
+            memory_percent=self.proc_metrics.get_memory_percent() if self.proc_metrics else psutil.virtual_memory().percent,
+            disk_percent=self.proc_metrics.get_disk_percent() if self.proc_metrics else psutil.disk_usage('/').percent,
+            temperature=self.get_cpu_temperature(),
+            uptime=now - self.boot_time,
+            network_stats=self.get_network_stats(),
+            vehicle_status={
+                'running': vc.running if vc else False,
+                'mining_active': vc.mining_active if vc else False,
+                'returning_to_dock': vc.returning_to_dock if vc else False
+            },
+            connectivity={
+                'wifi_connected': True,  # Assume connected if streaming
+                'bluetooth_connected': False,  # Would be updated by Bluetooth module
+                'gps_available': False  # Would be updated by GPS module
+            }
+        ))
+    
+    def store_system_data(self, system_data):
+        """Keep and queue a system sample read by read_system_data"""
+        # Add to buffer
+        self.system_buffer.append(system_data)
         
-        while self.running:
-            try:
-                system_data = {
-                    'timestamp': time.time(),
-                    'type': 'system',
-                    'data': {
-                        'cpu_percent': psutil.cpu_percent(),
-                        'memory_percent': psutil.virtual_memory().percent,
-                        'disk_percent': psutil.disk_usage('/').percent,
-                        'temperature': self.get_cpu_temperature(),
-                        'uptime': time.time() - psutil.boot_time(),
-                        'network_stats': self.get_network_stats(),
-                        'vehicle_status': {
-                            'running': getattr(self.vehicle_controller, 'running', False) if self.vehicle_controller else False,
-                            'mining_active': getattr(self.vehicle_controller, 'mining_active', False) if self.vehicle_controller else False,
-                            'returning_to_dock': getattr(self.vehicle_controller, 'returning_to_dock', False) if self.vehicle_controller else False
-                        },
-                        'connectivity': {
-                            'wifi_connected': True,  # Assume connected if streaming
-                            'bluetooth_connected': False,  # Would be updated by Bluetooth module
-                            'gps_available': False  # Would be updated by GPS module
-                        }
-                    }
-                }
-                
-                # Add to buffer
-                self.system_buffer.append(system_data)
-                
-                # Add to queue
-                try:
-                    self.system_queue.put_nowait(system_data)
-                except queue.Full:
-                    try:
-                        self.system_queue.get_nowait()
-                        self.system_queue.put_nowait(system_data)
-                    except queue.Empty:
-                        pass
-                
-                time.sleep(1.0 / self.stream_rates['system'])
-                
-            except Exception as e:
-                logger.error(f"Error in system data thread: {e}")
-                time.sleep(1)
+        # Add to queue; a full deque drops its oldest item
+        self.system_queue.append(system_data)
+        return True
+    
+    def collect_gps_data(self):
+        """Collect one GPS sample"""
+        # Simulate GPS data (would be replaced with real GPS module)
+        gps_data = StreamMessage(time.time(), 'gps', GpsData())
         
-        logger.info("📡 System data thread stopped")
+        # Add to buffer
+        self.gps_buffer.append(gps_data)
+        
+        # Without a fix every record is the same, so repeats are sent as a marker
+        return self.queue_unless_repeated(self.gps_queue, gps_data)
     
-    def gps_data_thread(self):
-        """Thread for collecting GPS data"""
-        logger.info("📡 GPS data thread started")
+    def collect_mining_data(self):
+        """Collect one mining sample"""
+        vc = self.vehicle_controller
+        if vc:
+            mining = MiningData(
+                active=vc.mining_active,
+                current_waypoint=self.waypoint_navigator.current_waypoint,
+                waypoints_completed=vc.waypoints_completed,
+                minerals_collected=vc.minerals_collected,
+                total_distance=self.slam_mapper.total_distance,
+                session_id=vc.current_session_id,
+                returning_to_dock=vc.returning_to_dock,
+                path_data=self.get_current_path_data()
+            )
+        else:
+            mining = MiningData(
+                active=False,
+                current_waypoint=None,
+                waypoints_completed=0,
+                minerals_collected=0,
+                total_distance=0,
+                session_id=None,
+                returning_to_dock=False,
+                path_data=None
+            )
+        mining_data = StreamMessage(time.time(), 'mining', mining)
         
-        while self.running:
-            try:
-                # Simulate GPS data (would be replaced with real GPS module)
-                gps_data = {
-                    'timestamp': time.time(),
-                    'type': 'gps',
-                    'data': {
-                        'latitude': None,
-                        'longitude': None,
-                        'altitude': None,
-                        'speed': None,
-                        'heading': None,
-                        'satellites': 0,
-                        'fix_quality': 0,
-                        'hdop': 99.9,
-                        'fix_available': False,
-                        'utm_coordinates': None,
-                        'local_coordinates': None
-                    }
-                }
-                
-                # Add to buffer
-                self.gps_buffer.append(gps_data)
-                
-                # Add to queue
-                try:
-                    self.gps_queue.put_nowait(gps_data)
-                except queue.Full:
-                    try:
-                        self.gps_queue.get_nowait()
-                        self.gps_queue.put_nowait(gps_data)
-                    except queue.Empty:
-                        pass
-                
-                time.sleep(1.0 / self.stream_rates['gps'])
-                
-            except Exception as e:
-                logger.error(f"Error in GPS data thread: {e}")
-                time.sleep(1)
+        # Idle mining status repeats, so send repeats as a marker
+        return self.queue_unless_repeated(self.mining_queue, mining_data)
+    
+    def queue_unless_repeated(self, stream_queue, record):
+        """Queue a record, or an UnchangedData marker if its data equals the previous record's.
+        Returns True if the record was new"""
+        stream_type = record.type
+        if record.data == self.last_stream_data.get(stream_type):
+            self.repeat_counts[stream_type] += 1
+            stream_queue.append(StreamMessage(record.timestamp, stream_type,
+                                              UnchangedData(True, self.repeat_counts[stream_type])))
+            return False
         
-        logger.info("📡 GPS data thread stopped")
+        self.last_stream_data[stream_type] = record.data
+        self.repeat_counts[stream_type] = 0
+        stream_queue.append(record)
+        return True
     
-    def mining_data_thread(self):
-        """Thread for collecting mining operation data"""
-        logger.info("📡 Mining data thread started")
+    async def produce_data(self):
+        """Collect the sensor, system, GPS and mining streams, each at its own rate"""
+        logger.info("📡 Data producer loop started")
         
-        while self.running:
-            try:
-                mining_data = {
-                    'timestamp': time.time(),
-                    'type': 'mining',
-                    'data': {
-                        'active': getattr(self.vehicle_controller, 'mining_active', False) if self.vehicle_controller else False,
-                        'current_waypoint': getattr(self.vehicle_controller.waypoint_navigator, 'current_waypoint', None) if self.vehicle_controller else None,
-                        'waypoints_completed': getattr(self.vehicle_controller, 'waypoints_completed', 0) if self.vehicle_controller else 0,
-                        'minerals_collected': getattr(self.vehicle_controller, 'minerals_collected', 0) if self.vehicle_controller else 0,
-                        'total_distance': getattr(self.vehicle_controller.slam_mapper, 'total_distance', 0) if self.vehicle_controller else 0,
-                        'session_id': getattr(self.vehicle_controller, 'current_session_id', None) if self.vehicle_controller else None,
-                        'returning_to_dock': getattr(self.vehicle_controller, 'returning_to_dock', False) if self.vehicle_controller else False,
-                        'path_data': self.get_current_path_data()
-                    }
-                }
+        # Streams that read hardware or /proc run in the default executor, so a slow read (e.g. an
+        # ultrasonic echo timeout) can't stall the event loop; their records are stored on the loop
+        readers = {
+            'sensors': (self.read_sensor_data, self.store_sensor_data),
+            'system': (self.read_system_data, self.store_system_data)
+        }
+        # In-memory streams are cheap enough to collect inline
+        collectors = {
+            'gps': self.collect_gps_data,
+            'mining': self.collect_mining_data
+        }
+        reads_in_flight = {}
+        
+        # Heap of (next deadline, stream type) on the monotonic clock
+        now = time.monotonic()
+        schedule = [(now, stream_type) for stream_type in [*readers, *collectors]]
+        heapq.heapify(schedule)
+        
+        try:
+            while self.running:
+                deadline, stream_type = heapq.heappop(schedule)
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
                 
-                # Add to queue
                 try:
-                    self.mining_queue.put_nowait(mining_data)
-                except queue.Full:
-                    try:
-                        self.mining_queue.get_nowait()
-                        self.mining_queue.put_nowait(mining_data)
-                    except queue.Empty:
-                        pass
+                    if stream_type in readers:
+                        # A read still running from the last tick means this tick is skipped
+                        if stream_type not in reads_in_flight:
+                            task = asyncio.ensure_future(self.collect_in_executor(stream_type, *readers[stream_type]))
+                            reads_in_flight[stream_type] = task
+                            task.add_done_callback(lambda _, stream_type=stream_type: reads_in_flight.pop(stream_type))
+                    # Only new data wakes the broadcaster; repeat markers ride along with the next send
+                    elif collectors[stream_type]():
+                        self.data_ready.set()
+                    # Fixed cadence; after an overrun, continue from now rather than bursting to catch up
+                    deadline = max(deadline + 1.0 / self.stream_rates[stream_type], time.monotonic())
+                except Exception as e:
+                    logger.error(f"Error collecting {stream_type} data: {e}")
+                    deadline = time.monotonic() + 1
                 
-                time.sleep(1.0 / self.stream_rates['mining'])
-                
-            except Exception as e:
-                logger.error(f"Error in mining data thread: {e}")
-                time.sleep(1)
+                heapq.heappush(schedule, (deadline, stream_type))
+        finally:
+            for task in list(reads_in_flight.values()):
+                task.cancel()
         
-        logger.info("📡 Mining data thread stopped")
+        logger.info("📡 Data producer loop stopped")
+    
+    async def collect_in_executor(self, stream_type, read, store):
+        """Run a blocking read in the default executor, then store its record on the event loop"""
+        try:
+            record = await asyncio.get_running_loop().run_in_executor(None, read)
+            if store(record):
+                self.data_ready.set()
+        except Exception as e:
+            logger.error(f"Error collecting {stream_type} data: {e}")
+    
+    def notify_broadcaster(self):
+        """Wake the broadcast loop from a producer thread"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.data_ready.set)
     
     def get_battery_voltage(self):
         """Get battery voltage (simulated)"""
@@ -367,27 +844,30 @@ class DataStreamManager:
         import random
         return round(12.0 + random.uniform(-0.5, 0.5), 2)
     
-    def get_system_temperature(self):
-        """Get system temperature"""
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read()) / 1000.0
-                return round(temp, 1)
-        except:
-            return None
-    
     def get_cpu_temperature(self):
-        """Get CPU temperature"""
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read()) / 1000.0
-                return round(temp, 1)
-        except:
-            return None
+        """Get CPU temperature, reusing the last reading for TEMPERATURE_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if now - self.temperature_time < TEMPERATURE_CACHE_TTL:
+            return self.temperature
+        
+        temperature = None
+        if self.thermal_fd is not None:
+            try:
+                # pread from offset 0 makes sysfs regenerate the value without reopening
+                temperature = round(int(os.pread(self.thermal_fd, 16, 0)) / 1000.0, 1)
+            except (OSError, ValueError):
+                pass
+        
+        self.temperature = temperature
+        self.temperature_time = now
+        return temperature
     
     def get_network_stats(self):
         """Get network statistics"""
         try:
+            if self.proc_metrics:
+                return self.proc_metrics.get_network_stats()
+            
             net_io = psutil.net_io_counters()
             return {
                 'bytes_sent': net_io.bytes_sent,
@@ -405,14 +885,13 @@ class DataStreamManager:
         
         try:
             # Get path from SLAM mapper
-            path_history = getattr(self.vehicle_controller.slam_mapper, 'path_history', [])
-            obstacles = getattr(self.vehicle_controller.slam_mapper, 'obstacles', [])
+            slam_mapper = self.slam_mapper
             
             return {
-                'path_history': list(path_history)[-50:],  # Last 50 points
-                'obstacles': obstacles[-20:],  # Last 20 obstacles
-                'current_position': getattr(self.vehicle_controller.slam_mapper, 'robot_position', [0, 0]),
-                'heading': getattr(self.vehicle_controller.slam_mapper, 'robot_heading', 0)
+                'path_history': list(slam_mapper.path_history)[-50:],  # Last 50 points
+                'obstacles': slam_mapper.obstacles[-20:],  # Last 20 obstacles
+                'current_position': slam_mapper.robot_position,
+                'heading': slam_mapper.robot_heading
             }
         except:
             return None
@@ -423,7 +902,8 @@ class DataStreamManager:
         logger.info(f"📡 WebSocket client connected: {client_id}")
         
         self.websocket_clients.add(websocket)
-        self.client_subscriptions[websocket] = set()
+        self.client_subscriptions[websocket] = frozenset()
+        self.subscriptions_changed = True
         self.stream_stats['connected_clients'] = len(self.websocket_clients)
         
         try:
@@ -436,12 +916,12 @@ class DataStreamManager:
                 'stream_rates': self.stream_rates,
                 'server_stats': self.get_stream_stats()
             }
-            await websocket.send(json.dumps(welcome_msg))
+            await websocket.send(dumps(welcome_msg))
             
             # Handle client messages
             async for message in websocket:
                 try:
-                    data = json.loads(message)
+                    data = loads(message)
                     await self.handle_client_message(websocket, data)
                 except json.JSONDecodeError:
                     error_msg = {
@@ -449,7 +929,7 @@ class DataStreamManager:
                         'timestamp': time.time(),
                         'message': 'Invalid JSON format'
                     }
-                    await websocket.send(json.dumps(error_msg))
+                    await websocket.send(dumps(error_msg))
                 
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"📡 WebSocket client disconnected: {client_id}")
@@ -459,82 +939,117 @@ class DataStreamManager:
             # Cleanup
             self.websocket_clients.discard(websocket)
             self.client_subscriptions.pop(websocket, None)
+            self.video_resync.discard(websocket)
+            self.subscriptions_changed = True
             self.stream_stats['connected_clients'] = len(self.websocket_clients)
     
     async def handle_client_message(self, websocket, data):
         """Handle message from WebSocket client"""
         msg_type = data.get('type', 'unknown')
+        now = time.time()
         
         if msg_type == 'subscribe':
             # Subscribe to data streams
             streams = data.get('streams', [])
-            for stream in streams:
-                if stream in self.stream_rates:
-                    self.client_subscriptions[websocket].add(stream)
+            self.client_subscriptions[websocket] = self.client_subscriptions[websocket].union(
+                stream for stream in streams if stream in self.stream_rates
+            )
+            self.subscriptions_changed = True
+            # Send the next record of every stream in full so the new subscriber has a baseline
+            self.last_stream_data.clear()
+            if 'video' in streams:
+                self.video_resync.add(websocket)
             
             response = {
                 'type': 'subscription_updated',
-                'timestamp': time.time(),
+                'timestamp': now,
                 'subscribed_streams': list(self.client_subscriptions[websocket])
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps(response))
             
         elif msg_type == 'unsubscribe':
             # Unsubscribe from data streams
             streams = data.get('streams', [])
-            for stream in streams:
-                self.client_subscriptions[websocket].discard(stream)
+            self.client_subscriptions[websocket] = self.client_subscriptions[websocket].difference(streams)
+            self.subscriptions_changed = True
             
             response = {
                 'type': 'subscription_updated',
-                'timestamp': time.time(),
+                'timestamp': now,
                 'subscribed_streams': list(self.client_subscriptions[websocket])
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps(response))
             
         elif msg_type == 'get_historical':
             # Send historical data
             stream_type = data.get('stream', 'sensors')
             limit = min(data.get('limit', 100), 1000)  # Max 1000 points
             
+            if stream_type.endswith('_binary'):
+                await self.send_binary_history(websocket, stream_type, limit)
+                return
+            
             historical_data = self.get_historical_data(stream_type, limit)
             
             response = {
                 'type': 'historical_data',
-                'timestamp': time.time(),
+                'timestamp': now,
                 'stream': stream_type,
                 'data': historical_data
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps(response))
             
         elif msg_type == 'ping':
             # Respond to ping
             response = {
                 'type': 'pong',
-                'timestamp': time.time(),
-                'server_time': time.time()
+                'timestamp': now,
+                'server_time': now
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps(response))
             
         elif msg_type == 'get_stats':
             # Send streaming statistics
             response = {
                 'type': 'stats',
-                'timestamp': time.time(),
+                'timestamp': now,
                 'data': self.get_stream_stats()
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps(response))
     
-    def get_historical_data(self, stream_type, limit):
-        """Get historical data for a stream type"""
+    async def send_binary_history(self, websocket, stream_type, limit):
+        """Send '<stream>_binary' history: a JSON reply describing the layout, then the packed arrays"""
+        buffer = self.get_history_buffer(stream_type[:-len('_binary')])
+        count, payload = buffer.pack(limit) if buffer is not None else (0, None)
+        
+        response = {
+            'type': 'historical_data',
+            'timestamp': time.time(),
+            'stream': stream_type,
+            'count': count,
+            'layout': buffer.layout if buffer is not None else [],
+            'scale': buffer.scales if buffer is not None else {}
+        }
+        await websocket.send(dumps(response))
+        if payload:
+            await websocket.send(payload)
+    
+    def get_history_buffer(self, stream_type):
+        """Return the history ring for a stream type, or None if it keeps no history"""
         if stream_type == 'sensors':
-            return list(self.sensor_buffer)[-limit:]
+            return self.sensor_buffer
         elif stream_type == 'system':
-            return list(self.system_buffer)[-limit:]
+            return self.system_buffer
         elif stream_type == 'gps':
-            return list(self.gps_buffer)[-limit:]
-        else:
+            return self.gps_buffer
+        return None
+    
+    def get_historical_data(self, stream_type, limit):
+        """Get historical data for a stream type"""
+        buffer = self.get_history_buffer(stream_type)
+        if buffer is None:
             return []
+        return buffer.records(buffer.tail(limit))
     
     def get_stream_stats(self):
         """Get streaming statistics"""
@@ -548,103 +1063,181 @@ class DataStreamManager:
             'messages_per_second': self.stream_stats['total_messages_sent'] / max(uptime, 1),
             'bytes_per_second': self.stream_stats['total_bytes_sent'] / max(uptime, 1),
             'queue_sizes': {
-                'sensors': self.sensor_queue.qsize(),
-                'video': self.video_queue.qsize(),
-                'system': self.system_queue.qsize(),
-                'gps': self.gps_queue.qsize(),
-                'mining': self.mining_queue.qsize()
+                'sensors': len(self.sensor_queue),
+                'video': len(self.video_queue),
+                'system': len(self.system_queue),
+                'gps': len(self.gps_queue),
+                'mining': len(self.mining_queue)
             }
         }
     
+    async def send_messages(self, websocket, messages):
+        """Send messages to one client in order"""
+        for message in messages:
+            await websocket.send(message)
+    
+    def select_video_message(self, websocket, video_binary, resync_binary):
+        """Pick the video message for one client: none while its socket is backed up past
+        SEND_HIGH_WATER_MARK, and after a skipped frame none until a keyframe (resync_binary)"""
+        if websocket.transport.get_write_buffer_size() > SEND_HIGH_WATER_MARK:
+            self.video_resync.add(websocket)
+            self.stream_stats['video_frames_skipped'] += 1
+            return None
+        if websocket in self.video_resync:
+            if resync_binary is None:
+                return None
+            self.video_resync.discard(websocket)
+            return resync_binary
+        return video_binary
+    
+    def pack_video_frame(self, frame_type, timestamp, frames):
+        """Build a binary video message: header followed by the frames' bytes"""
+        payload = b''.join(frames)
+        return struct.pack(VIDEO_HEADER_FORMAT, frame_type, timestamp, len(payload)) + payload
+    
+    def drain_repeatable(self, stream_queue):
+        """Pop every queued record and return the newest, except that an UnchangedData marker
+        never replaces a full record drained along with it"""
+        latest = None
+        while stream_queue:
+            record = stream_queue.popleft()
+            if latest is None or not isinstance(record.data, UnchangedData) or isinstance(latest.data, UnchangedData):
+                latest = record
+        return latest
+    
     async def broadcast_data(self):
         """Broadcast data to all connected WebSocket clients"""
         logger.info("📡 Starting data broadcast loop")
         
         while self.running:
             try:
+                # Sleep until a producer has queued something
+                await self.data_ready.wait()
+                self.data_ready.clear()
+                now = time.time()
+                
                 # Collect data from all queues
                 data_to_send = {}
                 
                 # Get sensor data
-                try:
-                    while not self.sensor_queue.empty():
-                        data_to_send['sensors'] = self.sensor_queue.get_nowait()
-                except queue.Empty:
-                    pass
+                while self.sensor_queue:
+                    data_to_send['sensors'] = self.sensor_queue.popleft()
                 
                 # Get video data
-                try:
-                    while not self.video_queue.empty():
-                        data_to_send['video'] = self.video_queue.get_nowait()
-                except queue.Empty:
-                    pass
+                video_data = None
+                video_frames = []
+                keyframe_index = None
+                while self.video_queue:
+                    video_data = self.video_queue.popleft()
+                    frame, video_data.data.frame = video_data.data.frame, None
+                    if frame:
+                        if video_data.data.keyframe:
+                            keyframe_index = len(video_frames)
+                        video_frames.append(frame)
+                
+                # resync_binary starts at the newest keyframe, for clients that can't use video_binary
+                video_binary = None
+                resync_binary = None
+                if video_frames:
+                    if video_data.data.codec == 'h264':
+                        # H.264 packets depend on the ones before them, so send every drained frame
+                        video_binary = self.pack_video_frame(VIDEO_FRAME_H264, video_data.timestamp, video_frames)
+                        if keyframe_index == 0:
+                            resync_binary = video_binary
+                        elif keyframe_index is not None:
+                            resync_binary = self.pack_video_frame(VIDEO_FRAME_H264, video_data.timestamp,
+                                                                  video_frames[keyframe_index:])
+                    else:
+                        video_binary = self.pack_video_frame(VIDEO_FRAME_JPEG, video_data.timestamp, video_frames[-1:])
+                        resync_binary = video_binary
+                elif video_data:
+                    # No frame (e.g. camera unavailable); clients still get the status in the JSON envelope
+                    data_to_send['video'] = video_data
                 
                 # Get system data
-                try:
-                    while not self.system_queue.empty():
-                        data_to_send['system'] = self.system_queue.get_nowait()
-                except queue.Empty:
-                    pass
+                while self.system_queue:
+                    data_to_send['system'] = self.system_queue.popleft()
                 
                 # Get GPS data
-                try:
-                    while not self.gps_queue.empty():
-                        data_to_send['gps'] = self.gps_queue.get_nowait()
-                except queue.Empty:
-                    pass
+                gps_data = self.drain_repeatable(self.gps_queue)
+                if gps_data:
+                    data_to_send['gps'] = gps_data
                 
                 # Get mining data
-                try:
-                    while not self.mining_queue.empty():
-                        data_to_send['mining'] = self.mining_queue.get_nowait()
-                except queue.Empty:
-                    pass
+                mining_data = self.drain_repeatable(self.mining_queue)
+                if mining_data:
+                    data_to_send['mining'] = mining_data
                 
                 # Send data to subscribed clients
-                if data_to_send and self.websocket_clients:
+                if (data_to_send or video_binary) and self.websocket_clients:
                     disconnected_clients = set()
+                    recipients = []
+                    sends = []
                     
-                    for websocket in self.websocket_clients.copy():
-                        try:
-                            client_data = {}
-                            subscriptions = self.client_subscriptions.get(websocket, set())
-                            
-                            # Only send subscribed data types
-                            for stream_type, data in data_to_send.items():
-                                if stream_type in subscriptions:
-                                    client_data[stream_type] = data
-                            
-                            if client_data:
-                                message = {
-                                    'type': 'stream_data',
-                                    'timestamp': time.time(),
-                                    'data': client_data
-                                }
-                                
-                                message_json = json.dumps(message)
-                                await websocket.send(message_json)
-                                
-                                # Update statistics
-                                self.stream_stats['total_messages_sent'] += 1
-                                self.stream_stats['total_bytes_sent'] += len(message_json)
-                                
-                        except websockets.exceptions.ConnectionClosed:
-                            disconnected_clients.add(websocket)
-                        except Exception as e:
-                            logger.error(f"📡 Error sending data to client: {e}")
+                    if self.subscriptions_changed:
+                        self.subscriptions_changed = False
+                        subscription_groups = {}
+                        for websocket, subscriptions in self.client_subscriptions.items():
+                            subscription_groups.setdefault(subscriptions, []).append(websocket)
+                        self.subscription_groups = subscription_groups
+                    
+                    for subscriptions, group in self.subscription_groups.items():
+                        client_data = {}
+                        messages = []
+                        send_video = video_binary is not None and 'video' in subscriptions
+                        
+                        # Only send subscribed data types
+                        for stream_type, data in data_to_send.items():
+                            if stream_type in subscriptions:
+                                client_data[stream_type] = data
+                        
+                        if client_data:
+                            message = {
+                                'type': 'stream_data',
+                                'timestamp': now,
+                                'data': client_data
+                            }
+                            messages.append(dumps(message))
+                        
+                        if messages or send_video:
+                            for websocket in group:
+                                client_messages = messages
+                                if send_video:
+                                    video_message = self.select_video_message(websocket, video_binary, resync_binary)
+                                    if video_message:
+                                        client_messages = messages + [video_message]
+                                if client_messages:
+                                    recipients.append((websocket, client_messages))
+                                    sends.append(asyncio.wait_for(self.send_messages(websocket, client_messages),
+                                                                  SEND_TIMEOUT))
+                    
+                    # Send to all clients concurrently so a slow one doesn't hold up the rest
+                    results = await asyncio.gather(*sends, return_exceptions=True)
+                    
+                    for (websocket, messages), result in zip(recipients, results):
+                        if isinstance(result, asyncio.TimeoutError):
+                            # Still connected, just slow; an interrupted video frame means it must resync
+                            self.video_resync.add(websocket)
+                            self.stream_stats['send_timeouts'] += 1
+                        elif isinstance(result, Exception):
+                            if not isinstance(result, websockets.exceptions.ConnectionClosed):
+                                logger.error(f"📡 Error sending data to client: {result}")
                             disconnected_clients.add(websocket)
+                        else:
+                            # Update statistics
+                            self.stream_stats['total_messages_sent'] += len(messages)
+                            self.stream_stats['total_bytes_sent'] += sum(len(message) for message in messages)
                     
                     # Remove disconnected clients
                     for websocket in disconnected_clients:
                         self.websocket_clients.discard(websocket)
                         self.client_subscriptions.pop(websocket, None)
+                        self.video_resync.discard(websocket)
                     
                     if disconnected_clients:
+                        self.subscriptions_changed = True
                         self.stream_stats['connected_clients'] = len(self.websocket_clients)
                 
-                # Control broadcast rate
-                await asyncio.sleep(0.1)  # 10 Hz broadcast rate
-                
             except Exception as e:
                 logger.error(f"📡 Error in broadcast loop: {e}")
                 await asyncio.sleep(1)
@@ -655,8 +1248,12 @@ class DataStreamManager:
         """Start WebSocket server"""
         logger.info(f"📡 Starting WebSocket server on {host}:{port}")
         
-        # Start data streaming threads
+        self.loop = asyncio.get_running_loop()
+        self.data_ready = asyncio.Event()
+        
+        # Start data streaming thread and producer task
         self.start_streaming()
+        producer_task = asyncio.create_task(self.produce_data())
         
         # Start WebSocket server
         server = await websockets.serve(
@@ -677,6 +1274,7 @@ class DataStreamManager:
             await server.wait_closed()
         finally:
             broadcast_task.cancel()
+            producer_task.cancel()
             self.stop_streaming()
 
 class StreamingAPI:
@@ -702,35 +1300,30 @@ class StreamingAPI:
             return None
     
     def get_latest_from_buffer(self, buffer):
-        """Get latest data from buffer"""
-        if buffer:
-            return buffer[-1]
-        return None
+        """Get latest data from buffer, as a record dict"""
+        if buffer.latest is None:
+            return None
+        return asdict(buffer.latest)
     
     def get_historical_data(self, stream_type, start_time=None, end_time=None, limit=100):
         """Get historical data with time filtering"""
-        if stream_type == 'sensors':
-            buffer = self.stream_manager.sensor_buffer
-        elif stream_type == 'system':
-            buffer = self.stream_manager.system_buffer
-        elif stream_type == 'gps':
-            buffer = self.stream_manager.gps_buffer
-        else:
+        buffer = self.stream_manager.get_history_buffer(stream_type)
+        if buffer is None:
             return []
         
-        data = list(buffer)
+        data = buffer.tail(len(buffer))
+        data.pop('scale', None)
         
         # Filter by time if specified
+        selected = np.ones(len(data['timestamp']), dtype=bool)
         if start_time:
-            data = [d for d in data if d['timestamp'] >= start_time]
+            selected &= data['timestamp'] >= start_time
         if end_time:
-            data = [d for d in data if d['timestamp'] <= end_time]
+            selected &= data['timestamp'] <= end_time
         
         # Limit results
-        if len(data) > limit:
-            data = data[-limit:]
-        
-        return data
+        data = {name: values[selected][-limit:] for name, values in data.items()}
+        return buffer.records(data)
     
     def get_stream_statistics(self):
         """Get streaming statistics"""
@@ -743,6 +1336,9 @@ def main():
     # Create stream manager
     stream_manager = DataStreamManager()
     
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+    
     # Start WebSocket server
     try:
         asyncio.run(stream_manager.start_websocket_server())
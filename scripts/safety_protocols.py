@@ -4,12 +4,14 @@ SmartRover Safety Protocols Module
 Implements comprehensive safety systems for autonomous mining operations
 """
 
+import atexit
 import time
 import threading
 import logging
 import json
 import sqlite3
 import math
+import weakref
 import numpy as np
 from datetime import datetime, timedelta
 from collections import deque
@@ -26,6 +28,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Safety events are buffered and written in one transaction once this many are pending,
+# or once the oldest has waited SAFETY_EVENT_FLUSH_INTERVAL (seconds)
+SAFETY_EVENT_FLUSH_COUNT = 50
+SAFETY_EVENT_FLUSH_INTERVAL = 1.0
+
+INSERT_SAFETY_EVENT_SQL = '''
+    INSERT INTO safety_events (event_type, severity, description, sensor_data)
+    VALUES (?, ?, ?, ?)
+'''
+
+def flush_at_exit(flush_ref):
+    """atexit hook: flush a monitor's pending safety events if the monitor still exists"""
+    flush = flush_ref()
+    if flush is not None:
+        flush()
+
 class SafetyMonitor:
     def __init__(self, vehicle_controller=None, database_path='/var/lib/smartrover/mining_data.db'):
         self.vehicle_controller = vehicle_controller
@@ -66,6 +84,16 @@ class SafetyMonitor:
         # Initialize safety database
         self.init_safety_database()
         
+        # One connection for the monitor's lifetime, opened by the first flush (and reopened
+        # after a failure). Events wait in _pending until a flush commits them; it is bounded
+        # so a database that stays unavailable can't grow it without limit
+        self._db = None
+        self._pending = deque(maxlen=1000)
+        self._db_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        # Weak reference, so the hook doesn't keep every monitor alive until exit
+        atexit.register(flush_at_exit, weakref.WeakMethod(self.flush_safety_events))
+        
         logger.info("🛡️ Safety monitor initialized")
     
     def init_safety_database(self):
@@ -157,6 +185,8 @@ class SafetyMonitor:
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=2)
         
+        self.flush_safety_events()
+        
         logger.info("🛡️ Safety monitoring stopped")
     
     def monitor_loop(self):
@@ -182,6 +212,9 @@ class SafetyMonitor:
                 if self.safety_status == 'EMERGENCY':
                     self.handle_emergency()
                 
+                # Write out events that have waited long enough, even if no new ones arrive
+                self._flush_if_due()
+                
                 time.sleep(self.check_interval)
                 
             except Exception as e:
@@ -500,6 +533,44 @@ class SafetyMonitor:
             
             self.violation_history.append(violation)
             
-            # Log to database
-            conn = sqlite3.connect(self.database_path)
-            cursor
+            # Queue for the database; written in batches by flush_safety_events
+            self._pending.append((event_type, severity, description, json.dumps(violation['sensor_data'])))
+            self._flush_if_due()
+            
+        except Exception as e:
+            logger.error(f"Error logging safety violation: {e}")
+    
+    def _flush_if_due(self):
+        """Flush pending safety events once enough have queued up or the oldest is too old"""
+        if self._pending and (len(self._pending) >= SAFETY_EVENT_FLUSH_COUNT or
+                              time.monotonic() - self._last_flush >= SAFETY_EVENT_FLUSH_INTERVAL):
+            self.flush_safety_events()
+    
+    def flush_safety_events(self):
+        """Write all pending safety events in a single transaction"""
+        with self._db_lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            
+            rows = []
+            while self._pending:
+                rows.append(self._pending.popleft())
+            
+            try:
+                if self._db is None:
+                    # Autocommit mode, so the transaction below is controlled explicitly
+                    self._db = sqlite3.connect(self.database_path, check_same_thread=False, isolation_level=None)
+                self._db.execute('BEGIN')
+                self._db.executemany(INSERT_SAFETY_EVENT_SQL, rows)
+                self._db.execute('COMMIT')
+            except sqlite3.Error as e:
+                logger.error(f"Error writing {len(rows)} safety events, will retry: {e}")
+                # Put the events back in order ahead of any logged meanwhile
+                self._pending.extendleft(reversed(rows))
+                if self._db is not None:
+                    try:
+                        self._db.close()  # Also rolls back the failed transaction
+                    except sqlite3.Error:
+                        pass
+                    self._db = None
@@ -11,6 +11,7 @@ import time
 import json
 import logging
 import os
+import socket
 import psutil
 import platform
 from pathlib import Path
@@ -37,11 +38,27 @@ vehicle_controller = None
 vehicle_thread = None
 database_path = '/var/lib/smartrover/mining_data.db'
 
+# Per-connection SQLite settings; WAL itself is persisted in the file by production setup
+DATABASE_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA mmap_size=134217728;
+    PRAGMA cache_size=-20000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA busy_timeout=5000;
+'''
+
+def connect_database():
+    """Open the mining database with the server's performance pragmas applied"""
+    conn = sqlite3.connect(database_path)
+    conn.executescript(DATABASE_PRAGMAS)
+    return conn
+
 def ensure_database():
     """Ensure database exists and is initialized"""
     os.makedirs(os.path.dirname(database_path), exist_ok=True)
     
-    conn = sqlite3.connect(database_path)
+    conn = connect_database()
     cursor = conn.cursor()
     
     # Create tables if they don't exist
@@ -183,7 +200,7 @@ def control_vehicle():
 def get_waypoints():
     """Get all waypoints"""
     try:
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -235,7 +252,7 @@ def add_waypoint():
                 'error': 'Missing required fields: name, x, y'
             }), 400
         
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -277,7 +294,7 @@ def delete_waypoint(waypoint_id):
                 'error': 'Cannot delete docking station'
             }), 400
         
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         
         cursor.execute('DELETE FROM waypoints WHERE id = ?', (waypoint_id,))
@@ -313,7 +330,7 @@ def delete_waypoint(waypoint_id):
 def get_mining_sessions():
     """Get mining session history"""
     try:
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -392,7 +409,7 @@ def get_logs():
     try:
         lines = int(request.args.get('lines', 50))
         
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -469,7 +486,7 @@ def get_cpu_temperature():
 def log_system_event(level, message, component='server'):
     """Log system event to database"""
     try:
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -485,7 +502,7 @@ def log_system_event(level, message, component='server'):
 def check_database_health():
     """Check database connectivity"""
     try:
-        conn = sqlite3.connect(database_path)
+        conn = connect_database()
         cursor = conn.cursor()
         cursor.execute('SELECT 1')
         conn.close()
@@ -515,6 +532,52 @@ def start_vehicle_thread():
     logger.info("Vehicle thread started")
     log_system_event('INFO', 'Vehicle controller started', 'vehicle')
 
+def sd_notify(state):
+    """Send a state update to systemd when running as a Type=notify service"""
+    address = os.environ.get('NOTIFY_SOCKET')
+    if not address:
+        return False
+    
+    # Abstract namespace sockets are advertised with a leading '@'
+    if address.startswith('@'):
+        address = '\0' + address[1:]
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.connect(address)
+            sock.sendall(state.encode())
+        return True
+    except OSError as e:
+        logger.warning(f"systemd notification failed: {e}")
+        return False
+
+def start_systemd_notifier(port=5000):
+    """Report readiness once the API accepts connections, then keep the systemd watchdog fed"""
+    if not os.environ.get('NOTIFY_SOCKET'):
+        return
+    
+    def server_listening():
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return True
+        except OSError:
+            return False
+    
+    def notify():
+        while not server_listening():
+            time.sleep(0.1)
+        sd_notify('READY=1')
+        logger.info("Notified systemd that the server is ready")
+        
+        # Ping at half the watchdog interval, only while the API still answers
+        watchdog_usec = int(os.environ.get('WATCHDOG_USEC', 0))
+        while watchdog_usec:
+            time.sleep(watchdog_usec / 2e6)
+            if server_listening():
+                sd_notify('WATCHDOG=1')
+    
+    threading.Thread(target=notify, daemon=True).start()
+
 if __name__ == '__main__':
     logger.info("Starting SmartRover Standalone Server...")
     
@@ -526,6 +589,7 @@ if __name__ == '__main__':
     start_vehicle_thread()
     
     # Start Flask server
+    start_systemd_notifier(port=5000)
     try:
         app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
     except Exception as e: